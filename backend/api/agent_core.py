@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
 import json
-from ..utils.aws_clients import get_bedrock_client
+from ..utils.aws_clients import get_bedrock_client, invoke_claude
 
 router = APIRouter()
 
@@ -62,17 +63,7 @@ async def autonomous_medical_assessment(
     """
     
     try:
-        response = bedrock.invoke_model(
-            modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1500,
-                "messages": [{"role": "user", "content": agent_prompt}]
-            })
-        )
-        
-        analysis = json.loads(response['body'].read())
-        ai_response = analysis['content'][0]['text']
+        ai_response = await asyncio.to_thread(invoke_claude, bedrock, agent_prompt, 1500)
         
         # Parse JSON response
         import re
@@ -151,18 +142,9 @@ async def care_orchestration_agent(
     """
     
     try:
-        response = bedrock.invoke_model(
-            modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "messages": [{"role": "user", "content": orchestration_prompt}]
-            })
-        )
-        
-        analysis = json.loads(response['body'].read())
+        orchestration_plan = await asyncio.to_thread(invoke_claude, bedrock, orchestration_prompt, 1000)
         return {
-            "orchestration_plan": analysis['content'][0]['text'],
+            "orchestration_plan": orchestration_plan,
             "patient_id": patient_id,
             "status": "active"
         }
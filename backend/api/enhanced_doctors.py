@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
-import json
-from ..utils.aws_clients import get_bedrock_client
+import asyncio
+from ..utils.aws_clients import get_bedrock_client, invoke_claude
 from ..models.enhanced_doctor import EnhancedDoctor, DoctorAnalytics, ConsultationType, DoctorStatus
 
 router = APIRouter()
@@ -79,17 +79,7 @@ async def get_doctor_ai_capabilities(doctor_id: str):
         Format as JSON with specific medical AI tools.
         """
         
-        response = bedrock.invoke_model(
-            modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 800,
-                "messages": [{"role": "user", "content": prompt}]
-            })
-        )
-        
-        analysis = json.loads(response['body'].read())
-        ai_capabilities = analysis['content'][0]['text']
+        ai_capabilities = await asyncio.to_thread(invoke_claude, bedrock, prompt, 800)
         
         return {
             "doctor_id": doctor_id,
@@ -134,17 +124,7 @@ async def ai_doctor_matching(symptoms: str, urgency: str = "medium"):
         Provide structured medical reasoning.
         """
         
-        response = bedrock.invoke_model(
-            modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 600,
-                "messages": [{"role": "user", "content": prompt}]
-            })
-        )
-        
-        analysis = json.loads(response['body'].read())
-        matching_result = analysis['content'][0]['text']
+        matching_result = await asyncio.to_thread(invoke_claude, bedrock, prompt, 600)
         
         return {
             "symptoms": symptoms,
@@ -1,14 +1,21 @@
 """
 Reports API endpoints for medical document analysis
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import ORJSONResponse
 from typing import Optional
+import json
 import logging
 import uuid
 
+from services.textract_service import get_document_analysis_service
+from utils.config import get_settings
+from utils.sns_verification import confirm_sns_subscription, verify_sns_message
+
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/reports", tags=["reports"])
+# Analysis payloads carry many entities and lab values; serialize them with orjson
+router = APIRouter(prefix="/api/reports", tags=["reports"], default_response_class=ORJSONResponse)
 
 @router.post("/upload")
 async def upload_report(
@@ -50,6 +57,11 @@ async def upload_report(
 async def get_report_analysis(report_id: str):
     """Get report analysis results"""
     try:
+        # Results of asynchronous Textract jobs are kept by the analysis service
+        completed = get_document_analysis_service().get_completed_analysis(report_id)
+        if completed:
+            return {'report_id': report_id, 'status': 'completed', 'analysis': completed.model_dump(mode='json')}
+        
         # Mock analysis retrieval
         analysis = {
             'report_id': report_id,
@@ -68,3 +80,42 @@ async def get_report_analysis(report_id: str):
     except Exception as e:
         logger.error(f"Report analysis retrieval failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to get report analysis")
+
+@router.post("/textract-notification")
+async def handle_textract_notification(request: Request):
+    """Complete a pending document analysis when Textract reports its job finished via SNS"""
+    try:
+        envelope = json.loads(await request.body())
+        
+        # Only signed messages from the configured Textract topic are accepted
+        if not await verify_sns_message(envelope, get_settings().textract_sns_topic_arn):
+            logger.warning(f"Rejected unverified SNS message for topic {envelope.get('TopicArn')}")
+            raise HTTPException(status_code=403, detail="Invalid SNS message")
+        
+        if envelope.get('Type') == 'SubscriptionConfirmation':
+            if not await confirm_sns_subscription(envelope):
+                raise HTTPException(status_code=502, detail="Failed to confirm SNS subscription")
+            return {'status': 'subscribed'}
+        if envelope.get('Type') != 'Notification':
+            return {'status': 'ignored'}
+        
+        message = json.loads(envelope.get('Message', '{}'))
+        job_id = message.get('JobId')
+        report_id = message.get('JobTag')
+        if not job_id or not report_id:
+            raise HTTPException(status_code=400, detail="Missing Textract job details")
+        
+        # complete_document_analysis ignores jobs this service did not start
+        result = await get_document_analysis_service().complete_document_analysis(job_id, report_id)
+        
+        return {
+            'report_id': report_id,
+            'job_id': job_id,
+            'status': 'completed' if result else 'in_progress'
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Textract notification handling failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to process Textract notification")
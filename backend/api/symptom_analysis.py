@@ -51,7 +51,7 @@ async def analyze_symptoms(request: SymptomAnalysisRequest):
             }
         
         # Perform full symptom analysis
-        result = analyze_symptoms_and_suggest_doctors(
+        result = await analyze_symptoms_and_suggest_doctors(
             patient_id=request.patient_id,
             input_text=request.symptoms_text,
             location=request.location
@@ -76,7 +76,7 @@ async def provide_clarification(request: ClarificationRequest):
         combined_text = f"{request.original_text}. Additional info: {request.clarification_answer}"
         
         # Perform symptom analysis with clarified information
-        result = analyze_symptoms_and_suggest_doctors(
+        result = await analyze_symptoms_and_suggest_doctors(
             patient_id=request.patient_id,
             input_text=combined_text
         )
@@ -2,13 +2,20 @@
 Voice API endpoints for MediMate Healthcare Platform.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import Dict, Any
+import hmac
+import json
 import logging
 
+from services.voice_service import resolve_transcription_job
+from utils.config import get_settings
+from utils.sns_verification import confirm_sns_subscription, verify_sns_message
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/voice", tags=["voice"])
+internal_router = APIRouter(prefix="/internal", tags=["internal"])
 
 @router.post("/speech-to-text")
 async def speech_to_text(request: Dict[str, Any]):
@@ -51,3 +58,47 @@ async def process_voice_command(request: Dict[str, Any]):
     except Exception as e:
         logger.error(f"Voice command error: {e}")
         raise HTTPException(status_code=500, detail="Voice command processing unavailable")
+
+@internal_router.post("/transcribe/complete")
+async def transcribe_job_complete(request: Request):
+    """Receive Transcribe job state change events and wake the waiting transcription"""
+    try:
+        event = json.loads(await request.body())
+        settings = get_settings()
+        
+        # Events arrive wrapped in a signed SNS message from the configured topic,
+        # or from an EventBridge API destination that sends the shared secret
+        if "Type" in event:
+            if not await verify_sns_message(event, settings.transcribe_sns_topic_arn):
+                logger.warning(f"Rejected unverified SNS message for topic {event.get('TopicArn')}")
+                raise HTTPException(status_code=403, detail="Invalid SNS message")
+            if event["Type"] == "SubscriptionConfirmation":
+                if not await confirm_sns_subscription(event):
+                    raise HTTPException(status_code=502, detail="Failed to confirm SNS subscription")
+                return {"status": "subscribed"}
+            if event["Type"] != "Notification":
+                return {"status": "ignored"}
+            event = json.loads(event.get("Message", "{}"))
+        else:
+            secret = request.headers.get("X-MediMate-Events-Secret", "")
+            if not settings.transcribe_events_secret or not hmac.compare_digest(
+                    secret.encode(), settings.transcribe_events_secret.encode()):
+                raise HTTPException(status_code=403, detail="Invalid event secret")
+        
+        detail = event.get("detail", {})
+        job_name = detail.get("TranscriptionJobName")
+        status = detail.get("TranscriptionJobStatus")
+        if not job_name or not status:
+            raise HTTPException(status_code=400, detail="Missing transcription job details")
+        
+        return {
+            "job_name": job_name,
+            "status": status,
+            "resolved": resolve_transcription_job(job_name, status)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Transcribe event handling failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to process transcription event")
@@ -13,7 +13,7 @@ This is the refactored main application that uses modular API routers and servic
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import Dict, Any
 import logging
 import boto3
@@ -36,7 +36,7 @@ from api.auth import router as auth_router
 from api.chat import router as chat_router
 from api.appointments import router as appointments_router
 from api.reports import router as reports_router
-from api.voice import router as voice_router
+from api.voice import router as voice_router, internal_router as voice_internal_router
 from api.ml_recommendations import router as ml_router
 from api.workflows import router as workflows_router
 from routes.blood_donation import router as blood_donation_router
@@ -68,7 +68,8 @@ app = FastAPI(
     version=settings.app_version,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
-    debug=settings.debug
+    debug=settings.debug,
+    default_response_class=ORJSONResponse
 )
 
 # Setup enhanced error handling
@@ -83,6 +84,7 @@ app.include_router(chat_router)
 app.include_router(appointments_router)
 app.include_router(reports_router)
 app.include_router(voice_router)
+app.include_router(voice_internal_router)
 app.include_router(ml_router)
 app.include_router(workflows_router)
 app.include_router(blood_donation_router)
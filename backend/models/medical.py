@@ -82,6 +82,7 @@ class DocumentAnalysisResponse(BaseModel):
     recommendations: List[str] = Field(default_factory=list, description="Medical recommendations")
     processed_at: datetime = Field(default_factory=lambda: datetime.now(), description="Processing timestamp")
     processing_time_ms: Optional[int] = Field(None, description="Processing time in milliseconds")
+    job_id: Optional[str] = Field(None, description="Textract job identifier while text detection is pending")
 
 class MedicalReport(BaseModel):
     """Complete medical report model."""
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import asyncio
 import boto3
 import json
 import uuid
@@ -141,23 +142,25 @@ async def generate_ai_insights(medical_data: Dict[str, Any], patient_profile: Di
         Keep responses clear, non-alarming, and educational.
         """
         
-        # Call Claude model
-        response = bedrock.invoke_model(
-            modelId='anthropic.claude-3-haiku-20240307-v1:0',
-            body=json.dumps({
-                'anthropic_version': 'bedrock-2023-05-31',
-                'max_tokens': 1000,
-                'messages': [
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ]
-            })
-        )
+        # Call Claude model and read the body in a worker thread
+        def invoke():
+            response = bedrock.invoke_model(
+                modelId='anthropic.claude-3-haiku-20240307-v1:0',
+                body=json.dumps({
+                    'anthropic_version': 'bedrock-2023-05-31',
+                    'max_tokens': 1000,
+                    'messages': [
+                        {
+                            'role': 'user',
+                            'content': prompt
+                        }
+                    ]
+                })
+            )
+            return json.loads(response['body'].read())
         
         # Parse response
-        response_body = json.loads(response['body'].read())
+        response_body = await asyncio.to_thread(invoke)
         ai_insights = response_body['content'][0]['text']
         
         return {
@@ -1,7 +1,12 @@
+import atexit
 import boto3
 import json
+import logging
+import threading
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 class CloudWatchService:
     def __init__(self):
         self.cloudwatch = boto3.client('cloudwatch', region_name='ap-south-1')
@@ -50,4 +55,96 @@ class CloudWatchService:
             print(f"Metric failed: {e}")
             return {"status": "metric_failed"}
 
-cloudwatch_service = CloudWatchService()
\ No newline at end of file
+class MetricBuffer:
+    """
+    Buffers metrics and triage log events off the request path and ships
+    them in batches (PutMetricData / PutLogEvents) from a background thread,
+    every flush_interval seconds or as soon as max_pending entries queue up.
+    """
+    
+    METRIC_BATCH_LIMIT = 1000  # PutMetricData data points per call
+    
+    def __init__(self, service, flush_interval=1.0, max_pending=500):
+        self.service = service
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._metrics = []
+        self._log_events = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+    
+    def add(self, metric_name, value, unit='Count'):
+        """Queue a metric data point"""
+        self._enqueue(self._metrics, {
+            'MetricName': metric_name,
+            'Value': value,
+            'Unit': unit,
+            'Timestamp': datetime.now()
+        })
+    
+    def log_triage_decision(self, patient_id, triage_level, symptoms, confidence=None):
+        """Queue a triage decision log event"""
+        now = datetime.now()
+        log_entry = {
+            'timestamp': now.isoformat(),
+            'patient_id': patient_id,
+            'triage_level': triage_level,
+            'symptoms': symptoms,
+            'confidence': confidence
+        }
+        self._enqueue(self._log_events, (
+            f"triage-{now.strftime('%Y-%m-%d')}",
+            {'timestamp': int(now.timestamp() * 1000), 'message': json.dumps(log_entry)}
+        ))
+    
+    def _enqueue(self, pending, entry):
+        with self._lock:
+            pending.append(entry)
+            full = len(self._metrics) + len(self._log_events) >= self.max_pending
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='cloudwatch-flush', daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+    
+    def flush(self):
+        """Send everything queued so far"""
+        with self._lock:
+            metrics, self._metrics = self._metrics, []
+            log_events, self._log_events = self._log_events, []
+        
+        for start in range(0, len(metrics), self.METRIC_BATCH_LIMIT):
+            try:
+                self.service.cloudwatch.put_metric_data(
+                    Namespace='MediMate/SymptomAnalysis',
+                    MetricData=metrics[start:start + self.METRIC_BATCH_LIMIT]
+                )
+            except Exception as e:
+                logger.error(f"Metric batch of {len(metrics[start:start + self.METRIC_BATCH_LIMIT])} data points failed: {e}")
+        
+        streams = {}
+        for stream, event in log_events:
+            streams.setdefault(stream, []).append(event)
+        for stream, events in streams.items():
+            events.sort(key=lambda event: event['timestamp'])
+            try:
+                self.service.logs.put_log_events(
+                    logGroupName=self.service.log_group,
+                    logStreamName=stream,
+                    logEvents=events
+                )
+            except Exception as e:
+                logger.error(f"CloudWatch log batch of {len(events)} events for {stream} failed: {e}")
+
+cloudwatch_service = CloudWatchService()
+metric_buffer = MetricBuffer(cloudwatch_service)
+
+# The flush thread is a daemon, so ship whatever is still queued when the process exits
+atexit.register(metric_buffer.flush)
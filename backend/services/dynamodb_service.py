@@ -5,13 +5,14 @@ Provides centralized database operations with error handling and retry logic.
 
 import json
 import logging
+import secrets
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, date
 from decimal import Decimal
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
-from utils.aws_clients import get_aws_clients
+from utils.aws_clients import get_aws_clients, retry_on_failure
 from models.user import User, UserCreate, UserUpdate
 from models.appointment import Appointment, AppointmentCreate, AppointmentUpdate
 from models.medical_report import MedicalReport, DocumentAnalysisRequest
@@ -165,27 +166,55 @@ class DynamoDBService:
         # Filter by specialty
         return [d for d in demo_doctors if specialty in d['specialties']][:3]
     
+    def _build_triage_log_entry(self, patient_id, input_text, entities, triage_level, specialties, reason):
+        """Build a triage log item; nested floats (entity scores) become Decimals"""
+        log_entry = {
+            'log_id': f"T_{secrets.token_hex(8)}_{int(datetime.now().timestamp())}",
+            'patient_id': patient_id,
+            'input_text': input_text,
+            'entities': entities,
+            'triage_level': triage_level,
+            'specialties': list(specialties),
+            'decision_reason': reason,
+            'timestamp': datetime.now().isoformat()
+        }
+        return json.loads(json.dumps(log_entry, default=str), parse_float=Decimal)
+    
     def save_triage_log(self, patient_id, input_text, entities, triage_level, specialties, reason):
         """Save triage decision log for audit and improvement"""
         try:
             table = self._get_table('triage_logs')
             
-            log_entry = {
-                'log_id': f"T_{int(datetime.now().timestamp())}",
-                'patient_id': patient_id,
-                'input_text': input_text,
-                'entities': entities,
-                'triage_level': triage_level,
-                'specialties': specialties,
-                'decision_reason': reason,
-                'timestamp': datetime.now().isoformat()
-            }
+            log_entry = self._build_triage_log_entry(
+                patient_id, input_text, entities, triage_level, specialties, reason
+            )
             
             table.put_item(Item=log_entry)
             logger.info(f"Triage log saved: {log_entry['log_id']}")
             
         except Exception as e:
             logger.error(f"Error saving triage log: {e}")
+    
+    def save_triage_logs(self, logs):
+        """Save many triage logs with BatchWriteItem, 25 items per request"""
+        try:
+            table = self._get_table('triage_logs')
+            entries = [self._build_triage_log_entry(*log) for log in logs]
+            
+            for start in range(0, len(entries), 25):
+                self._batch_put(table, entries[start:start + 25])
+            
+            logger.info(f"Triage logs saved: {len(entries)}")
+            
+        except Exception as e:
+            logger.error(f"Error saving {len(logs)} triage logs: {e}")
+    
+    @retry_on_failure(max_retries=3, delay=0.5, backoff=2)
+    def _batch_put(self, table, items):
+        """Write one batch; batch_writer resubmits UnprocessedItems, throttling is retried with backoff"""
+        with table.batch_writer() as writer:
+            for item in items:
+                writer.put_item(Item=item)
 
     # User Operations
     
@@ -367,4 +396,10 @@ dynamodb_service = DynamoDBService()
 
 def get_dynamodb_service() -> DynamoDBService:
     """Get the global DynamoDB service instance."""
-    return dynamodb_service
\ No newline at end of file
+    return dynamodb_service
+
+
+# Module-level shortcuts used by the symptom analysis pipeline
+find_doctors_by_specialty = dynamodb_service.find_doctors_by_specialty
+save_triage_log = dynamodb_service.save_triage_log
+save_triage_logs = dynamodb_service.save_triage_logs
@@ -8,9 +8,15 @@ Comprehensive notification system using AWS SNS and SES for:
 - Automated follow-up workflows
 """
 
+import asyncio
 import boto3
+from botocore.config import Config
 import json
 import logging
+import orjson
+import secrets
+import string
+import time
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
@@ -19,23 +25,101 @@ from email.mime.base import MIMEBase
 from email import encoders
 
 from utils.config import get_settings
-from utils.aws_clients import get_aws_clients
+from utils.aws_clients import get_aws_clients, retry_on_failure
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Long-lived, thread-safe clients share one pooled keep-alive connection config
+_CFG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+# Notification audit log is shipped to CloudWatch Logs in batches
+NOTIFICATION_LOG_GROUP = '/medimate/notifications'
+NOTIFICATION_LOG_RETENTION_DAYS = 30
+LOG_FLUSH_INTERVAL_SECONDS = 5
+LOG_FLUSH_MAX_EVENTS = 1000
+DYNAMODB_BATCH_SIZE = 25  # BatchWriteItem hard limit
+
+# Report-ready emails are coalesced into SendBulkTemplatedEmail calls
+REPORT_READY_SES_TEMPLATE = 'medimate-report-ready'
+SES_BULK_MAX_DESTINATIONS = 50  # SendBulkTemplatedEmail hard limit
+EMAIL_FLUSH_INTERVAL_SECONDS = 1
+
+# Raw SMS bodies; parsed once into format segments like the email templates
+RAW_SMS = {
+    'appointment_reminder': "MediMate Reminder: You have an appointment with Dr. {doctor_name} on {date} at {time}. Reply STOP to opt out.",
+    'urgent_alert': "MediMate Alert: {message}. Please contact your healthcare provider immediately.",
+    'verification_code': "Your MediMate verification code is: {code}. Valid for 10 minutes."
+}
+
+
+def _compile_template(raw: str) -> List[tuple]:
+    """Parse a str.format template once into (literal, field, spec, conversion) segments."""
+    return list(string.Formatter().parse(raw))
+
+
+def _render_template(parts: List[tuple], data: Dict[str, Any]) -> str:
+    """Render a template compiled with _compile_template()."""
+    out = []
+    for literal, field, spec, conversion in parts:
+        out.append(literal)
+        if field is not None:
+            value = data[field]
+            if conversion == 'r':
+                value = repr(value)
+            elif conversion == 's':
+                value = str(value)
+            elif conversion == 'a':
+                value = ascii(value)
+            out.append(format(value, spec or ''))
+    return ''.join(out)
+
+
+def _to_ses_template(parts: List[tuple]) -> str:
+    """Convert a compiled template to SES handlebars syntax ({field} -> {{field}})."""
+    return ''.join(literal + ('{{' + field + '}}' if field else '') for literal, field, _, _ in parts)
+
+
 class NotificationService:
     """Enhanced notification service with AWS SNS and SES integration."""
     
     def __init__(self):
         """Initialize notification service with AWS clients."""
         self.aws_clients = get_aws_clients()
-        self.sns_client = self.aws_clients.sns
-        self.ses_client = self.aws_clients.ses
-        self.dynamodb = self.aws_clients.dynamodb
+        self.sns_client = self.aws_clients.get_sns_client()
+        self.ses_client = self.aws_clients.get_ses_client()
+        self.dynamodb = self.aws_clients.get_dynamodb_resource()
+        self._scheduled_table = self.dynamodb.Table('medimate-scheduled-notifications') if self.dynamodb else None
+        self._log_table = self.dynamodb.Table('medimate-notifications-log') if self.dynamodb else None
         
-        # Notification templates
-        self.email_templates = {
+        try:
+            self.cwl_client = boto3.client('logs', region_name=self.aws_clients.region, config=_CFG)
+        except Exception as e:
+            logger.warning(f"CloudWatch Logs client not available: {str(e)}")
+            self.cwl_client = None
+        
+        # Buffered notification log entries as (epoch_ms, item)
+        self._log_buf: List[tuple] = []
+        # One stream per process per UTC day, named when each batch is flushed
+        self._log_stream_suffix = secrets.token_hex(4)
+        self._log_group_ready = False
+        self._ready_log_stream: Optional[str] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Pending report-ready bulk email destinations as (queue_id, destination)
+        self._report_email_buf: List[tuple] = []
+        self._report_email_task: Optional[asyncio.Task] = None
+        self._ses_template_ready = False
+        # SES MaxSendRate (emails/second), read once; bulk calls are spaced to stay under it
+        self._ses_max_send_rate: Optional[float] = None
+        self._ses_next_send_at = 0.0
+        
+        # Notification templates, compiled once into format segments
+        raw_email_templates = {
             'appointment_confirmation': self._get_appointment_confirmation_template(),
             'appointment_reminder': self._get_appointment_reminder_template(),
             'health_alert': self._get_health_alert_template(),
@@ -43,11 +127,13 @@ class NotificationService:
             'password_reset': self._get_password_reset_template(),
             'medical_report_ready': self._get_report_ready_template()
         }
+        self.email_templates = {
+            name: {part: _compile_template(text) for part, text in template.items()}
+            for name, template in raw_email_templates.items()
+        }
         
         self.sms_templates = {
-            'appointment_reminder': "MediMate Reminder: You have an appointment with Dr. {doctor_name} on {date} at {time}. Reply STOP to opt out.",
-            'urgent_alert': "MediMate Alert: {message}. Please contact your healthcare provider immediately.",
-            'verification_code': "Your MediMate verification code is: {code}. Valid for 10 minutes."
+            name: _compile_template(raw) for name, raw in RAW_SMS.items()
         }
 
     async def send_email_notification(
@@ -69,22 +155,28 @@ class NotificationService:
             attachments: List of file attachments
             
         Returns:
-            Dict with send status and message ID
+            Dict with send status and message ID. Report-ready emails are sent in
+            bulk batches: they return status 'queued' and a 'queued_' message ID
+            that the notification log records next to the SES MessageId.
         """
         try:
             if not self.ses_client:
                 logger.warning("SES client not available, using fallback")
                 return await self._send_fallback_email(recipient_email, template_name, template_data)
             
+            # Report-ready emails go out in bulk batches
+            if template_name == 'medical_report_ready' and not subject_override and not attachments:
+                return await self._queue_report_ready_email(recipient_email, template_data)
+            
             # Get template
             template = self.email_templates.get(template_name)
             if not template:
                 raise ValueError(f"Email template '{template_name}' not found")
             
             # Populate template
-            subject = subject_override or template['subject'].format(**template_data)
-            html_body = template['html_body'].format(**template_data)
-            text_body = template['text_body'].format(**template_data)
+            subject = subject_override or _render_template(template['subject'], template_data)
+            html_body = _render_template(template['html_body'], template_data)
+            text_body = _render_template(template['text_body'], template_data)
             
             # Create message
             message = {
@@ -97,7 +189,7 @@ class NotificationService:
             
             # Send email
             response = self.ses_client.send_email(
-                Source=settings.ses_sender_email,
+                Source=settings.ses_from_email,
                 Destination={'ToAddresses': [recipient_email]},
                 Message=message
             )
@@ -165,7 +257,7 @@ class NotificationService:
                 raise ValueError(f"SMS template '{template_name}' not found")
             
             # Populate message
-            message = message_override or template.format(**template_data)
+            message = message_override or _render_template(template, template_data)
             
             # Send SMS
             response = self.sns_client.publish(
@@ -322,10 +414,9 @@ class NotificationService:
             ttl = int(send_time.timestamp())
             
             # Store scheduled notification
-            table = self.dynamodb.Table('medimate-scheduled-notifications')
-            
             item = {
-                'notification_id': f"reminder_{datetime.utcnow().timestamp()}",
+                # Random prefix spreads writes across partitions; epoch suffix keeps ids sortable
+                'notification_id': f"reminder_{secrets.token_hex(8)}_{int(time.time())}",
                 'notification_data': notification_data,
                 'send_time': send_time.isoformat(),
                 'ttl': ttl,
@@ -333,7 +424,7 @@ class NotificationService:
                 'created_at': datetime.utcnow().isoformat()
             }
             
-            table.put_item(Item=item)
+            self._scheduled_table.put_item(Item=item)
             
             logger.info(f"Notification scheduled for {send_time}")
             return {
@@ -346,6 +437,109 @@ class NotificationService:
             logger.error(f"Failed to schedule notification: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    # Bulk report-ready emails
+    
+    async def _queue_report_ready_email(self, recipient_email: str, template_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a report-ready email for the next SendBulkTemplatedEmail batch."""
+        queue_id = f"queued_{secrets.token_hex(8)}"
+        self._report_email_buf.append((queue_id, {
+            'Destination': {'ToAddresses': [recipient_email]},
+            'ReplacementTemplateData': orjson.dumps(template_data, default=str).decode()
+        }))
+        
+        if len(self._report_email_buf) >= SES_BULK_MAX_DESTINATIONS:
+            await self.flush_report_ready_emails()
+        elif self._report_email_task is None or self._report_email_task.done():
+            self._report_email_task = asyncio.create_task(self._report_email_loop())
+        
+        return {'success': True, 'message_id': queue_id, 'status': 'queued'}
+
+    async def _report_email_loop(self) -> None:
+        """Periodically send queued report-ready emails."""
+        while self._report_email_buf:
+            await asyncio.sleep(EMAIL_FLUSH_INTERVAL_SECONDS)
+            await self.flush_report_ready_emails()
+
+    async def flush_report_ready_emails(self) -> None:
+        """Send all queued report-ready emails, 50 destinations per SES call."""
+        pending, self._report_email_buf = self._report_email_buf, []
+        if not pending:
+            return
+        
+        batches = [
+            pending[start:start + SES_BULK_MAX_DESTINATIONS]
+            for start in range(0, len(pending), SES_BULK_MAX_DESTINATIONS)
+        ]
+        await asyncio.gather(*(self._send_report_ready_batch(batch) for batch in batches))
+
+    async def _send_report_ready_batch(self, batch: List[tuple]) -> None:
+        """Send one SendBulkTemplatedEmail call and log each destination's outcome."""
+        await self._wait_for_send_rate(len(batch))
+        try:
+            await asyncio.to_thread(self._ensure_ses_template)
+            response = await asyncio.to_thread(
+                self.ses_client.send_bulk_templated_email,
+                Source=settings.ses_from_email,
+                Template=REPORT_READY_SES_TEMPLATE,
+                DefaultTemplateData='{}',
+                Destinations=[destination for _, destination in batch]
+            )
+            statuses = response.get('Status', [])
+        except Exception as e:
+            logger.error(f"Failed to send {len(batch)} report-ready emails: {str(e)}")
+            statuses = [{'Status': 'Failed', 'Error': str(e)}] * len(batch)
+        
+        timestamp = datetime.utcnow().isoformat()
+        for (queue_id, destination), status in zip(batch, statuses):
+            entry = {
+                'type': 'email',
+                'recipient': destination['Destination']['ToAddresses'][0],
+                'template': 'medical_report_ready',
+                'status': 'sent' if status.get('Status') == 'Success' else 'failed',
+                'queue_id': queue_id,
+                'timestamp': timestamp
+            }
+            if status.get('MessageId'):
+                entry['message_id'] = status['MessageId']
+            if status.get('Error'):
+                entry['error'] = status['Error']
+            await self._log_notification(entry)
+
+    async def _wait_for_send_rate(self, email_count: int) -> None:
+        """Delay a bulk call so queued emails go out no faster than the SES max send rate."""
+        if self._ses_max_send_rate is None:
+            self._ses_max_send_rate = await asyncio.to_thread(self._read_max_send_rate)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        send_at = max(now, self._ses_next_send_at)
+        self._ses_next_send_at = send_at + email_count / self._ses_max_send_rate
+        if send_at > now:
+            await asyncio.sleep(send_at - now)
+
+    def _read_max_send_rate(self) -> float:
+        """The account's SES MaxSendRate in emails per second (1 if unreadable)."""
+        try:
+            return max(1.0, float(self.ses_client.get_send_quota()['MaxSendRate']))
+        except Exception as e:
+            logger.warning(f"Could not read SES send quota: {str(e)}")
+            return 1.0
+
+    def _ensure_ses_template(self) -> None:
+        """Register the report-ready template with SES once."""
+        if self._ses_template_ready:
+            return
+        template = self.email_templates['medical_report_ready']
+        try:
+            self.ses_client.create_template(Template={
+                'TemplateName': REPORT_READY_SES_TEMPLATE,
+                'SubjectPart': _to_ses_template(template['subject']),
+                'HtmlPart': _to_ses_template(template['html_body']),
+                'TextPart': _to_ses_template(template['text_body'])
+            })
+        except self.ses_client.exceptions.AlreadyExistsException:
+            pass
+        self._ses_template_ready = True
+
     # Email Templates
     
     def _get_appointment_confirmation_template(self) -> Dict[str, str]:
@@ -719,7 +913,7 @@ class NotificationService:
         logger.info(f"Fallback: Would send email to {recipient} using template {template}")
         return {
             'success': True,
-            'message_id': f"fallback_{datetime.utcnow().timestamp()}",
+            'message_id': f"fallback_{time.time_ns()}",
             'status': 'fallback_sent'
         }
 
@@ -728,18 +922,93 @@ class NotificationService:
         logger.info(f"Fallback: Would send SMS to {phone} using template {template}")
         return {
             'success': True,
-            'message_id': f"fallback_{datetime.utcnow().timestamp()}",
+            'message_id': f"fallback_{time.time_ns()}",
             'status': 'fallback_sent'
         }
 
     async def _log_notification(self, notification_data: Dict[str, Any]) -> None:
-        """Log notification to DynamoDB for tracking."""
+        """Buffer notification log entry; flushed to CloudWatch Logs in batches."""
+        self._log_buf.append((int(time.time() * 1000), notification_data))
+        
+        if len(self._log_buf) >= LOG_FLUSH_MAX_EVENTS:
+            await self.flush_notification_logs()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Periodically flush buffered notification logs."""
+        while self._log_buf:
+            await asyncio.sleep(LOG_FLUSH_INTERVAL_SECONDS)
+            await self.flush_notification_logs()
+
+    async def flush_notification_logs(self) -> None:
+        """Write all buffered notification logs in a single batch."""
+        if not self._log_buf:
+            return
+        batch, self._log_buf = self._log_buf, []
         try:
-            if self.dynamodb:
-                table = self.dynamodb.Table('medimate-notifications-log')
-                table.put_item(Item=notification_data)
+            await asyncio.to_thread(self._write_log_batch, batch)
         except Exception as e:
-            logger.error(f"Failed to log notification: {str(e)}")
+            logger.error(f"Failed to log {len(batch)} notifications: {str(e)}")
+
+    def _write_log_batch(self, batch: List[tuple]) -> None:
+        """Ship a batch of log entries to CloudWatch Logs, or DynamoDB when that fails."""
+        if self.cwl_client:
+            try:
+                self.cwl_client.put_log_events(
+                    logGroupName=NOTIFICATION_LOG_GROUP,
+                    logStreamName=self._ensure_log_stream(),
+                    logEvents=[
+                        {'timestamp': ts, 'message': orjson.dumps(item, default=str).decode()}
+                        for ts, item in sorted(batch, key=lambda entry: entry[0])
+                    ]
+                )
+                return
+            except Exception as e:
+                if not self._log_table:
+                    raise
+                logger.warning(f"CloudWatch Logs write failed, logging {len(batch)} notifications to DynamoDB: {str(e)}")
+        if self._log_table:
+            items = [item for _, item in batch]
+            for start in range(0, len(items), DYNAMODB_BATCH_SIZE):
+                self._write_log_chunk(items[start:start + DYNAMODB_BATCH_SIZE])
+
+    @retry_on_failure(max_retries=3, delay=0.5, backoff=2)
+    def _write_log_chunk(self, items: List[Dict[str, Any]]) -> None:
+        """Write up to 25 log items with one BatchWriteItem call.
+
+        batch_writer re-queues UnprocessedItems itself; throttling errors are
+        retried with exponential backoff by the decorator.
+        """
+        with self._log_table.batch_writer() as writer:
+            for item in items:
+                writer.put_item(Item=item)
+
+    def _ensure_log_stream(self) -> str:
+        """Create the log group (30-day retention) once and today's stream for this process; return its name."""
+        stream = f"notifications-{datetime.utcnow().strftime('%Y-%m-%d')}-{self._log_stream_suffix}"
+        if stream == self._ready_log_stream:
+            return stream
+        exists = self.cwl_client.exceptions.ResourceAlreadyExistsException
+        if not self._log_group_ready:
+            try:
+                self.cwl_client.create_log_group(logGroupName=NOTIFICATION_LOG_GROUP)
+                self.cwl_client.put_retention_policy(
+                    logGroupName=NOTIFICATION_LOG_GROUP,
+                    retentionInDays=NOTIFICATION_LOG_RETENTION_DAYS
+                )
+            except exists:
+                pass
+            self._log_group_ready = True
+        try:
+            self.cwl_client.create_log_stream(
+                logGroupName=NOTIFICATION_LOG_GROUP,
+                logStreamName=stream
+            )
+        except exists:
+            pass
+        self._ready_log_stream = stream
+        return stream
 
 # Global notification service instance
 notification_service = NotificationService()
\ No newline at end of file
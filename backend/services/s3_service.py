@@ -1,16 +1,37 @@
 import boto3
-import uuid
+import logging
+import secrets
+import time
+from botocore.config import Config
 from datetime import datetime
 
+from utils.cache_manager import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Pooled keep-alive connections; the client is thread-safe and long-lived,
+# so reuse the module-level s3_service instead of creating one per request
+_CFG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+# Presigned URLs are reused until this many seconds before they expire, so a
+# cached URL is handed out with between this margin and its full lifetime left
+URL_CACHE_MARGIN_SECONDS = 60
+URL_CACHE_MAX_ENTRIES = 10_000
+
 class S3Service:
     def __init__(self):
-        self.s3 = boto3.client('s3', region_name='ap-south-1')
+        self.s3 = boto3.client('s3', region_name='ap-south-1', config=_CFG)
         self.bucket_name = 'medimate-patient-files'
+        self._url_cache = CacheManager(max_entries=URL_CACHE_MAX_ENTRIES)
     
     def upload_medical_file(self, file_content, patient_id, file_type='pdf'):
         """Upload medical file to S3"""
         try:
-            file_key = f"patients/{patient_id}/reports/{uuid.uuid4()}.{file_type}"
+            file_key = f"patients/{patient_id}/reports/{secrets.token_hex(16)}.{file_type}"
             
             self.s3.put_object(
                 Bucket=self.bucket_name,
@@ -24,21 +45,63 @@ class S3Service:
                 "file_key": file_key,
                 "url": f"s3://{self.bucket_name}/{file_key}"
             }
-        except Exception as e:
-            print(f"S3 upload failed: {e}")
+        except Exception:
+            logger.exception("S3 upload failed for patient %s", patient_id)
             return {"status": "upload_failed"}
     
+    def upload_file_bytes(self, file_bytes, key, content_type='application/octet-stream'):
+        """Upload raw bytes to S3 under the given key"""
+        self.s3.put_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=file_bytes,
+            ContentType=content_type,
+            ServerSideEncryption='AES256'
+        )
+        return f"s3://{self.bucket_name}/{key}"
+    
+    def _presign(self, cache_key, expiration, client_method, params):
+        """Return (url, seconds until it expires), reusing a cached URL while still valid"""
+        cached = self._url_cache.get(cache_key)
+        if cached:
+            url, expires_at = cached
+            return url, int(expires_at - time.time())
+        
+        url = self.s3.generate_presigned_url(client_method, Params=params, ExpiresIn=expiration)
+        if expiration > URL_CACHE_MARGIN_SECONDS:
+            self._url_cache.set(cache_key, (url, time.time() + expiration), ttl=expiration - URL_CACHE_MARGIN_SECONDS)
+        return url, expiration
+    
     def get_file_url(self, file_key, expiration=3600):
-        """Generate presigned URL for file access"""
+        """Generate presigned URL for file access; expires_in is the URL's remaining lifetime in seconds"""
         try:
-            url = self.s3.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': self.bucket_name, 'Key': file_key},
-                ExpiresIn=expiration
+            url, expires_in = self._presign(
+                f"{file_key}:{expiration}", expiration, 'get_object',
+                {'Bucket': self.bucket_name, 'Key': file_key}
             )
-            return {"status": "success", "url": url}
-        except Exception as e:
-            print(f"URL generation failed: {e}")
+            return {"status": "success", "url": url, "expires_in": expires_in}
+        except Exception:
+            logger.exception("URL generation failed for %s", file_key)
             return {"status": "failed"}
+    
+    def generate_presigned_put(self, key, content_type='application/octet-stream', expiration=3600):
+        """Generate a presigned PUT URL for uploading straight to S3.
+        
+        Objects are written once: consumers such as Transcribe read the returned
+        s3_uri in place instead of the server uploading the bytes again.
+        """
+        try:
+            url, expires_in = self._presign(
+                f"put:{key}:{content_type}:{expiration}", expiration, 'put_object',
+                {'Bucket': self.bucket_name, 'Key': key, 'ContentType': content_type}
+            )
+            return {"status": "success", "url": url, "s3_uri": f"s3://{self.bucket_name}/{key}", "expires_in": expires_in}
+        except Exception:
+            logger.exception("Presigned PUT generation failed for %s", key)
+            return {"status": "failed"}
+
+s3_service = S3Service()
 
-s3_service = S3Service()
\ No newline at end of file
+def get_s3_service() -> S3Service:
+    """Return the shared S3 service instance."""
+    return s3_service
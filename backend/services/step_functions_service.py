@@ -2,7 +2,7 @@
 Step Functions service for workflow orchestration
 """
 import logging
-import uuid
+import secrets
 from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -13,7 +13,7 @@ class StepFunctionsService:
     
     def start_execution(self, workflow_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Start workflow execution"""
-        execution_id = str(uuid.uuid4())
+        execution_id = secrets.token_hex(16)
         
         return {
             'execution_arn': f"{self.state_machine_arn}:execution:{execution_id}",
@@ -1,38 +1,84 @@
-import json
+import asyncio
+import atexit
+import logging
+import orjson
+import re
+import types
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from .comprehend_service import extract_medical_entities
-from .dynamodb_service import find_doctors_by_specialty, save_triage_log
+from .dynamodb_service import find_doctors_by_specialty, save_triage_logs
 from .bedrock_service import get_bedrock_service
+from .cloudwatch_service import metric_buffer
+from .notification_service import notification_service
+from utils.cache_manager import cached
+from utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Fixed Bedrock request envelope; only the JSON-encoded prompt is spliced in per call
+_BEDROCK_REQUEST_TEMPLATE = (
+    b'{"anthropic_version":"bedrock-2023-05-31","max_tokens":500,"temperature":0.1,'
+    b'"messages":[{"role":"user","content":%s}]}'
+)
 
 # Red flag symptoms requiring immediate emergency care
-RED_FLAGS = {
+RED_FLAGS = frozenset({
     "chest pain", "severe bleeding", "loss of consciousness", 
     "severe shortness of breath", "sudden weakness", "difficulty breathing",
     "severe headache", "stroke symptoms", "heart attack"
-}
+})
+
+# Shared pool for concurrent per-specialty doctor lookups
+_DOCTOR_LOOKUP_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='doctor-lookup')
+
+# Triage logs are written off the request path in batches of up to 25
+TRIAGE_LOG_BATCH_SIZE = 25
+_triage_log_queue = asyncio.Queue()
+_triage_log_task = None
+
+# Words in free text that indicate urgent (non-emergency) care
+URGENT_KEYWORDS = ("severe", "intense", "unbearable", "can't breathe", "crushing", "sudden")
+
+_RED_FLAG_RE = re.compile('|'.join(re.escape(flag) for flag in RED_FLAGS))
+_URGENT_RE = re.compile('|'.join(re.escape(keyword) for keyword in URGENT_KEYWORDS), re.IGNORECASE)
+
+# Symptom mentions that need a follow-up detail, and the details that satisfy them
+_CLARIFY_RE = re.compile(r'(?P<pain>pain)|(?P<fever>fever)|(?P<headache>headache)')
+_SEVERITY_RE = re.compile(r'severe|mild|moderate|scale|/10')
+_TEMPERATURE_RE = re.compile(r'temperature|°|degrees')
+_DURATION_RE = re.compile(r'hours|days|weeks')
+
+# Symptom to specialty mapping (read-only, safe to share across threads)
+SYMPTOM_TO_SPECIALTY = types.MappingProxyType({
+    "chest pain": ("cardiology", "emergency_medicine"),
+    "shortness of breath": ("pulmonology", "cardiology"),
+    "fever": ("internal_medicine", "general_practitioner"),
+    "headache": ("neurology", "general_practitioner"),
+    "abdominal pain": ("gastroenterology", "general_practitioner"),
+    "rash": ("dermatology",),
+    "dizziness": ("cardiology", "neurology"),
+    "blood in stool": ("gastroenterology", "emergency_medicine"),
+    "nausea": ("gastroenterology", "general_practitioner"),
+    "fatigue": ("internal_medicine", "general_practitioner")
+})
 
-# Symptom to specialty mapping
-SYMPTOM_TO_SPECIALTY = {
-    "chest pain": ["cardiology", "emergency_medicine"],
-    "shortness of breath": ["pulmonology", "cardiology"],
-    "fever": ["internal_medicine", "general_practitioner"],
-    "headache": ["neurology", "general_practitioner"],
-    "abdominal pain": ["gastroenterology", "general_practitioner"],
-    "rash": ["dermatology"],
-    "dizziness": ["cardiology", "neurology"],
-    "blood in stool": ["gastroenterology", "emergency_medicine"],
-    "nausea": ["gastroenterology", "general_practitioner"],
-    "fatigue": ["internal_medicine", "general_practitioner"]
-}
+# Fuzzy matching: a lookahead alternation built once at import finds every
+# mapped symptom contained in the input in a single pass
+_SYMPTOM_KEY_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in sorted(SYMPTOM_TO_SPECIALTY, key=len, reverse=True)) + '))'
+)
+_SYMPTOM_KEY_ORDER = {k: i for i, k in enumerate(SYMPTOM_TO_SPECIALTY)}
 
-def analyze_symptoms_and_suggest_doctors(patient_id, input_text, location=None):
+async def analyze_symptoms_and_suggest_doctors(patient_id, input_text, location=None):
     """
     Main function to analyze symptoms and suggest appropriate doctors
     """
     try:
         # 1. Extract medical entities
-        entities = extract_medical_entities(input_text)
+        entities = await asyncio.to_thread(extract_medical_entities, input_text)
         symptoms = [e['text'].lower() for e in entities if e['category'] == 'SYMPTOM']
         
         # 2. Determine triage level
@@ -43,15 +89,12 @@ def analyze_symptoms_and_suggest_doctors(patient_id, input_text, location=None):
         
         # 4. Handle emergency cases
         if triage_result['level'] == 'emergency':
-            # Send emergency notifications
-            from .notification_service import notification_service
-            from .cloudwatch_service import cloudwatch_service
+            # Send emergency notifications; a failed alert must not downgrade the triage
+            await _alert_medical_team(patient_id, input_text, symptoms)
+            metric_buffer.log_triage_decision(patient_id, 'emergency', symptoms)
+            metric_buffer.add('EmergencyTriageCount', 1)
             
-            notification_service.send_emergency_alert(patient_id, input_text)
-            cloudwatch_service.log_triage_decision(patient_id, 'emergency', symptoms)
-            cloudwatch_service.put_metric('EmergencyTriageCount', 1)
-            
-            save_triage_log(patient_id, input_text, entities, 'emergency', specialties, triage_result['reason'])
+            _queue_triage_log(patient_id, input_text, entities, 'emergency', specialties, triage_result['reason'])
             return {
                 "triage": "emergency",
                 "message": "🚨 MEDICAL EMERGENCY DETECTED\n\nBased on your symptoms, this requires immediate medical attention. Do not wait - seek emergency care now.",
@@ -64,19 +107,20 @@ def analyze_symptoms_and_suggest_doctors(patient_id, input_text, location=None):
                 "warning": "Emergency alert sent to medical team. Please proceed to nearest emergency room immediately."
             }
         
-        # 5. Find matching doctors
-        doctor_suggestions = find_matching_doctors(specialties, location)
-        
-        # 6. Generate explanation
-        explanation = generate_patient_explanation(symptoms, triage_result['level'], specialties)
+        # 5-6. Find doctors and generate explanation concurrently
+        level = triage_result['level']
+        primary_specialty_label = specialties[0].replace('_', ' ') if specialties else 'general practitioner'
+        doctor_suggestions, explanation = await asyncio.gather(
+            asyncio.to_thread(find_matching_doctors, specialties, location),
+            asyncio.to_thread(generate_patient_explanation, symptoms, level, specialties, primary_specialty_label)
+        )
         
-        # 7. Save triage log
-        save_triage_log(patient_id, input_text, entities, triage_result['level'], specialties, triage_result['reason'])
+        # 7. Save triage log (queued, written in the background)
+        _queue_triage_log(patient_id, input_text, entities, level, specialties, triage_result['reason'])
         
-        # 7. Log metrics
-        from .cloudwatch_service import cloudwatch_service
-        cloudwatch_service.log_triage_decision(patient_id, triage_result['level'], symptoms)
-        cloudwatch_service.put_metric(f'Triage{triage_result["level"].title()}Count', 1)
+        # 8. Log metrics (buffered, flushed in the background)
+        metric_buffer.log_triage_decision(patient_id, level, symptoms)
+        metric_buffer.add(f'Triage{level.title()}Count', 1)
         
         return {
             "triage": triage_result['level'],
@@ -84,33 +128,88 @@ def analyze_symptoms_and_suggest_doctors(patient_id, input_text, location=None):
             "doctor_suggestions": doctor_suggestions,
             "explanation": explanation,
             "next_steps": get_next_steps(triage_result['level'], specialties),
-            "appointment_prompt": f"Would you like me to book an appointment with a {specialties[0].replace('_', ' ')} specialist?",
+            "appointment_prompt": f"Would you like me to book an appointment with a {primary_specialty_label} specialist?",
             "privacy_note": "Your health data is securely stored and encrypted. We never share it without your consent."
         }
         
-    except Exception as e:
-        print(f"Error in symptom analysis: {e}")
+    except Exception:
+        logger.exception("Error in symptom analysis")
         return {
             "error": "Unable to analyze symptoms. Please consult a healthcare provider.",
             "triage": "routine",
             "doctor_suggestions": []
         }
 
+async def _alert_medical_team(patient_id, input_text, symptoms):
+    """
+    Publish an emergency triage alert to the system alerts SNS topic, logging any failure
+    """
+    topic_arn = get_settings().sns_system_alerts_topic_arn
+    if not topic_arn or not notification_service.sns_client:
+        logger.warning("Emergency alert for patient %s not sent: no alerts topic configured", patient_id)
+        return
+    
+    try:
+        await asyncio.to_thread(
+            notification_service.sns_client.publish,
+            TopicArn=topic_arn,
+            Subject="MediMate emergency triage",
+            Message=orjson.dumps({
+                "patient_id": patient_id,
+                "symptoms": symptoms,
+                "input_text": input_text,
+                "timestamp": datetime.utcnow().isoformat()
+            }).decode()
+        )
+    except Exception:
+        logger.exception("Emergency alert failed for patient %s", patient_id)
+
+def _queue_triage_log(*log):
+    """
+    Queue a triage log and make sure the background writer is running
+    """
+    global _triage_log_task
+    _triage_log_queue.put_nowait(log)
+    if _triage_log_task is None or _triage_log_task.done():
+        _triage_log_task = asyncio.get_running_loop().create_task(_write_triage_logs())
+
+async def _write_triage_logs():
+    """
+    Drain queued triage logs and write them with DynamoDB batch writes
+    """
+    while True:
+        batch = [await _triage_log_queue.get()]
+        while len(batch) < TRIAGE_LOG_BATCH_SIZE and not _triage_log_queue.empty():
+            batch.append(_triage_log_queue.get_nowait())
+        await asyncio.to_thread(save_triage_logs, batch)
+
+def drain_triage_logs():
+    """
+    Write triage logs still queued when the process exits
+    """
+    logs = []
+    while not _triage_log_queue.empty():
+        logs.append(_triage_log_queue.get_nowait())
+    if logs:
+        save_triage_logs(logs)
+
+# The writer task dies with the event loop; whatever it has not taken yet is saved here
+atexit.register(drain_triage_logs)
+
 def determine_triage(symptoms, input_text):
     """
     Determine urgency level based on symptoms
     """
     # Check for red flag symptoms
     for symptom in symptoms:
-        if any(flag in symptom for flag in RED_FLAGS):
+        if _RED_FLAG_RE.search(symptom):
             return {
                 "level": "emergency",
                 "reason": f"Red flag symptom detected: {symptom}"
             }
     
     # Check for urgent indicators in text
-    urgent_keywords = ["severe", "intense", "unbearable", "can't breathe", "crushing", "sudden"]
-    if any(keyword in input_text.lower() for keyword in urgent_keywords):
+    if _URGENT_RE.search(input_text):
         return {
             "level": "urgent", 
             "reason": "Severe symptom indicators present"
@@ -134,10 +233,9 @@ def map_symptoms_to_specialties(symptoms):
                 specialty_scores[specialty] = specialty_scores.get(specialty, 0) + 1
         else:
             # Fuzzy matching for partial matches
-            for key_symptom, specialties in SYMPTOM_TO_SPECIALTY.items():
-                if key_symptom in symptom or symptom in key_symptom:
-                    for specialty in specialties:
-                        specialty_scores[specialty] = specialty_scores.get(specialty, 0) + 0.5
+            for key_symptom in _fuzzy_symptom_keys(symptom):
+                for specialty in SYMPTOM_TO_SPECIALTY[key_symptom]:
+                    specialty_scores[specialty] = specialty_scores.get(specialty, 0) + 0.5
     
     # Default to general practitioner if no matches
     if not specialty_scores:
@@ -146,85 +244,100 @@ def map_symptoms_to_specialties(symptoms):
     # Sort by score
     return sorted(specialty_scores.keys(), key=lambda k: -specialty_scores[k])
 
+def _fuzzy_symptom_keys(symptom):
+    """
+    Mapped symptoms that contain, or are contained in, the given symptom
+    """
+    matches = {m.group(1) for m in _SYMPTOM_KEY_RE.finditer(symptom)}
+    # Partial words ("head", "nause") are substrings of a key, not whole tokens
+    matches.update(key_symptom for key_symptom in SYMPTOM_TO_SPECIALTY if symptom in key_symptom)
+    # Keep mapping order so score ties rank as before
+    return sorted(matches, key=_SYMPTOM_KEY_ORDER.__getitem__)
+
 def find_matching_doctors(specialties, location=None):
     """
     Find doctors matching the required specialties
     """
-    all_doctors = []
-    
-    for specialty in specialties[:3]:  # Top 3 specialties
-        doctors = find_doctors_by_specialty(specialty, location=location, limit=5)
-        all_doctors.extend(doctors)
+    # Top 3 specialties, looked up concurrently
+    results = _DOCTOR_LOOKUP_EXECUTOR.map(
+        lambda specialty: find_doctors_by_specialty(specialty, location=location, limit=5),
+        specialties[:3]
+    )
     
-    # Remove duplicates and sort by rating
+    # Remove duplicates, computing each doctor's sort key once
     unique_doctors = {}
-    for doctor in all_doctors:
-        if doctor['doctor_id'] not in unique_doctors:
-            unique_doctors[doctor['doctor_id']] = doctor
+    for doctors in results:
+        for doctor in doctors:
+            if doctor['doctor_id'] not in unique_doctors:
+                sort_key = (-float(doctor.get('rating') or 0), 0 if doctor.get('available_today') else 1)
+                unique_doctors[doctor['doctor_id']] = (sort_key, doctor)
     
-    # Sort by rating and availability
-    sorted_doctors = sorted(
-        unique_doctors.values(), 
-        key=lambda d: (-d.get('rating', 0), d.get('available_today', False)),
-        reverse=False
-    )
+    # Highest rating first, doctors available today first within a rating
+    ranked = sorted(unique_doctors.values(), key=itemgetter(0))
     
-    return sorted_doctors[:10]
+    return [doctor for _, doctor in ranked[:10]]
 
-def generate_patient_explanation(symptoms, triage_level, specialties):
+def generate_patient_explanation(symptoms, triage_level, specialties, primary_specialty_label=None):
     """
     Generate patient-friendly explanation using Bedrock
     """
     try:
-        prompt = f"""
-        You are MediMate, a professional AI healthcare assistant. A patient reported: {', '.join(symptoms)}.
-        
-        Triage: {triage_level} | Specialties: {', '.join(specialties[:2])}
-        
-        Respond in this format:
-        
-        "Hello! I'm MediMate, your AI healthcare assistant. I'm here to guide you, but I'm not a replacement for a licensed doctor.
-        
-        **Immediate Care Steps:**
-        • [Specific care for these symptoms]
-        • [Monitoring advice]
-        • [Self-care measures]
-        
-        **Seek Medical Care If:**
-        • [Red flag symptoms to watch for]
-        • [Timeline for seeking care]
-        
-        **Next Steps:**
-        Would you like me to connect you with a {specialties[0].replace('_', ' ')} specialist for further evaluation?
-        
-        **Privacy Note:** Your health data is securely stored and encrypted.
-        **Important:** This is preliminary guidance only - not a substitute for professional medical advice."
-        """
-        
-        bedrock_service = get_bedrock_service()
-        if not bedrock_service.client:
-            return "AI service temporarily unavailable. Please consult a healthcare provider."
-        
-        import json
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 500,
-            "temperature": 0.1,
-            "messages": [{"role": "user", "content": prompt}]
-        }
-        
-        response = bedrock_service.client.invoke_model(
-            modelId="anthropic.claude-3-5-sonnet-20240620-v1:0",
-            body=json.dumps(request_body)
+        if primary_specialty_label is None:
+            primary_specialty_label = specialties[0].replace('_', ' ') if specialties else 'general practitioner'
+        explanation = _generate_explanation(
+            tuple(sorted(set(symptoms))), triage_level, ', '.join(specialties[:2]), primary_specialty_label
         )
+        if explanation is None:
+            return "AI service temporarily unavailable. Please consult a healthcare provider."
+        return explanation
         
-        response_body = json.loads(response['body'].read())
-        return response_body['content'][0]['text']
-        
-    except Exception as e:
-        print(f"Error generating explanation: {e}")
+    except Exception:
+        logger.exception("Error generating explanation")
         return "Please consult with a healthcare provider for proper evaluation of your symptoms."
 
+@cached(ttl=3600, key_prefix="symptom_explanation", maxsize=2048)
+def _generate_explanation(symptoms, triage_level, specialties_comma, primary_specialty_label):
+    """
+    Bedrock explanation for a normalized (symptoms, triage, specialties) key.
+    Recurring triage patterns are served from cache; failures are not cached.
+    """
+    prompt = f"""
+    You are MediMate, a professional AI healthcare assistant. A patient reported: {', '.join(symptoms)}.
+    
+    Triage: {triage_level} | Specialties: {specialties_comma}
+    
+    Respond in this format:
+    
+    "Hello! I'm MediMate, your AI healthcare assistant. I'm here to guide you, but I'm not a replacement for a licensed doctor.
+    
+    **Immediate Care Steps:**
+    • [Specific care for these symptoms]
+    • [Monitoring advice]
+    • [Self-care measures]
+    
+    **Seek Medical Care If:**
+    • [Red flag symptoms to watch for]
+    • [Timeline for seeking care]
+    
+    **Next Steps:**
+    Would you like me to connect you with a {primary_specialty_label} specialist for further evaluation?
+    
+    **Privacy Note:** Your health data is securely stored and encrypted.
+    **Important:** This is preliminary guidance only - not a substitute for professional medical advice."
+    """
+    
+    bedrock_service = get_bedrock_service()
+    if not bedrock_service.client:
+        return None
+    
+    response = bedrock_service.client.invoke_model(
+        modelId="anthropic.claude-3-5-sonnet-20240620-v1:0",
+        body=_BEDROCK_REQUEST_TEMPLATE % orjson.dumps(prompt)
+    )
+    
+    response_body = orjson.loads(response['body'].read())
+    return response_body['content'][0]['text']
+
 def get_next_steps(triage_level, specialties):
     """
     Get recommended next steps based on triage level
@@ -253,18 +366,17 @@ def needs_clarification(input_text):
     Determine if more information is needed for proper triage
     """
     clarifying_questions = []
+    text = input_text.lower()
+    mentioned = {m.lastgroup for m in _CLARIFY_RE.finditer(text)}
     
-    if "pain" in input_text.lower():
-        if not any(word in input_text.lower() for word in ["severe", "mild", "moderate", "scale", "/10"]):
-            clarifying_questions.append("On a scale of 1-10, how severe is the pain?")
+    if "pain" in mentioned and not _SEVERITY_RE.search(text):
+        clarifying_questions.append("On a scale of 1-10, how severe is the pain?")
     
-    if "fever" in input_text.lower():
-        if not any(word in input_text.lower() for word in ["temperature", "°", "degrees"]):
-            clarifying_questions.append("How long have you had the fever?")
+    if "fever" in mentioned and not _TEMPERATURE_RE.search(text):
+        clarifying_questions.append("How long have you had the fever?")
     
-    if "headache" in input_text.lower():
-        if not any(word in input_text.lower() for word in ["hours", "days", "weeks"]):
-            clarifying_questions.append("How long have you had the headache?")
+    if "headache" in mentioned and not _DURATION_RE.search(text):
+        clarifying_questions.append("How long have you had the headache?")
     
     if len(input_text.split()) < 5:
         clarifying_questions.append("Can you describe your symptoms in more detail? When did they start?")
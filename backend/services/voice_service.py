@@ -3,79 +3,243 @@ AWS Voice Services (Transcribe & Polly) for MediMate Healthcare Platform.
 Handles voice input/output for accessibility and enhanced user experience.
 """
 
+import asyncio
 import boto3
-import json
+import httpx
 import logging
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime
+import orjson
+import os
+import re
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Union
+from datetime import datetime, timezone
 import uuid
 import base64
-from botocore.exceptions import ClientError
+import hashlib
+import threading
+from collections import OrderedDict
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.exceptions import BotoCoreError, ClientError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from utils.cache_manager import CacheManager
 import io
 
 logger = logging.getLogger(__name__)
 
+# Transcription job polling: exponential backoff from poll_interval_base up to the cap
+TRANSCRIBE_MAX_WAIT_SECONDS = 300
+TRANSCRIBE_MAX_POLL_INTERVAL_SECONDS = 30
+
+# The Polly voice catalog rarely changes; DescribeVoices results are reused this long
+VOICES_CACHE_TTL_SECONDS = int(os.getenv('POLLY_VOICES_CACHE_TTL_SECONDS', '3600'))
+
+# When an EventBridge rule (source aws.transcribe, detail-type "Transcribe Job
+# State Change") delivers job events to POST /internal/transcribe/complete,
+# transcribe_audio awaits that event instead of polling. The route accepts
+# signed SNS messages from TRANSCRIBE_SNS_TOPIC_ARN, or direct deliveries that
+# carry TRANSCRIBE_EVENTS_SECRET in the X-MediMate-Events-Secret header
+TRANSCRIBE_EVENTS_ENABLED = os.getenv('TRANSCRIBE_EVENTS_ENABLED', 'false').lower() == 'true'
+_pending_transcriptions: Dict[str, asyncio.Future] = {}
+
+def resolve_transcription_job(job_name: str, status: str) -> bool:
+    """Wake the request waiting on a transcription job; returns False if none is waiting."""
+    future = _pending_transcriptions.get(job_name)
+    if future is None or future.done():
+        return False
+    future.set_result(status)
+    return True
+
+# Synthesis results kept for repeated texts (an S3 key, or base64 audio when inline)
+SPEECH_CACHE_MAX_ENTRIES = 512
+
+# Synthesized audio is stored in S3 and returned as a presigned GET URL valid this
+# long; POLLY_INLINE_AUDIO=true restores base64 audio in the JSON for clients
+# that cannot follow URLs
+SPEECH_URL_EXPIRATION_SECONDS = 3600
+POLLY_INLINE_AUDIO = os.getenv('POLLY_INLINE_AUDIO', 'false').lower() == 'true'
+
+# Voice responses sign Polly requests themselves and send them over a
+# pooled keep-alive httpx client, skipping botocore's per-call endpoint
+# resolution and event hooks; boto3 is used when this path fails
+POLLY_DIRECT_HTTP_ENABLED = os.getenv('POLLY_DIRECT_HTTP_ENABLED', 'true').lower() == 'true'
+POLLY_HTTP_TIMEOUT_SECONDS = 10
+
+# Voice responses are synthesized as soon as they arrive, at most this many at
+# once; Polly has no batch API, so nothing waits for other requests
+POLLY_MAX_CONCURRENCY = 16
+
+# SSML rewrites applied by PollyService._prepare_medical_ssml in a single regex
+# pass: IPA pronunciations for medical terms, pauses after punctuation and
+# emphasis on urgent words. "{}" is filled with the matched text.
+_SSML_TABLE = {
+    'hypertension': '<phoneme alphabet="ipa" ph="ˌhaɪpərˈtɛnʃən">{}</phoneme>',
+    'diabetes': '<phoneme alphabet="ipa" ph="ˌdaɪəˈbiːtiːz">{}</phoneme>',
+    'pneumonia': '<phoneme alphabet="ipa" ph="nuːˈmoʊniə">{}</phoneme>',
+    'arrhythmia': '<phoneme alphabet="ipa" ph="əˈrɪθmiə">{}</phoneme>',
+    'tachycardia': '<phoneme alphabet="ipa" ph="ˌtækɪˈkɑrdiə">{}</phoneme>',
+    '.': '{}<break time="500ms"/>',
+    ',': '{}<break time="300ms"/>',
+    '!': '{}<break time="700ms"/>',
+    '?': '{}<break time="600ms"/>',
+    'emergency': '<emphasis level="strong">{}</emphasis>',
+    'urgent': '<emphasis level="strong">{}</emphasis>',
+    'critical': '<emphasis level="strong">{}</emphasis>',
+    'severe': '<emphasis level="strong">{}</emphasis>',
+    'immediate': '<emphasis level="strong">{}</emphasis>'
+}
+_SSML_RE = re.compile(
+    '|'.join(re.escape(key) for key in sorted(_SSML_TABLE, key=len, reverse=True)),
+    re.IGNORECASE
+)
+
+# Supported languages for medical transcription
+SUPPORTED_LANGUAGES: Mapping[str, str] = MappingProxyType({
+    'en-US': 'English (US)',
+    'en-GB': 'English (UK)',
+    'en-AU': 'English (Australia)',
+    'es-US': 'Spanish (US)',
+    'fr-FR': 'French',
+    'de-DE': 'German',
+    'it-IT': 'Italian',
+    'pt-BR': 'Portuguese (Brazil)',
+    'hi-IN': 'Hindi (India)',
+    'ta-IN': 'Tamil (India)'
+})
+
+# Available Polly voices for different languages
+POLLY_VOICES: Mapping[str, Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    'en-US': MappingProxyType({
+        'female': ('Joanna', 'Kimberly', 'Salli', 'Kendra', 'Ivy'),
+        'male': ('Matthew', 'Justin', 'Joey')
+    }),
+    'en-GB': MappingProxyType({
+        'female': ('Emma', 'Amy'),
+        'male': ('Brian',)
+    }),
+    'hi-IN': MappingProxyType({
+        'female': ('Aditi',),
+        'male': ()
+    }),
+    'es-US': MappingProxyType({
+        'female': ('Penelope', 'Lupe'),
+        'male': ('Miguel',)
+    })
+})
+
+# Keyword -> category for VoiceService._generate_ai_response, matched in one pass
+_SYMPTOM_CATEGORIES = {
+    'chest pain': 'cardiac',
+    'heart': 'cardiac',
+    'cardiac': 'cardiac',
+    'headache': 'headache',
+    'head pain': 'headache',
+    'fever': 'fever',
+    'temperature': 'fever'
+}
+_SYMPTOM_RE = re.compile('|'.join(re.escape(keyword) for keyword in sorted(_SYMPTOM_CATEGORIES, key=len, reverse=True)))
+_SYMPTOM_PRIORITY = ('cardiac', 'headache', 'fever')
+_SYMPTOM_RESPONSES = {
+    'cardiac': "I understand you're experiencing chest pain. This could be serious. Please seek immediate medical attention if the pain is severe, radiating to your arm or jaw, or accompanied by shortness of breath. For mild discomfort, try to rest and avoid strenuous activity.",
+    'headache': "Headaches can have various causes. Try to rest in a quiet, dark room and stay hydrated. If the headache is severe, sudden, or accompanied by fever, vision changes, or neck stiffness, please seek medical attention immediately.",
+    'fever': "A fever indicates your body is fighting an infection. Stay hydrated, rest, and monitor your temperature. Seek medical attention if your fever is above 103°F (39.4°C), persists for more than 3 days, or is accompanied by severe symptoms.",
+    'general': "Thank you for sharing your symptoms with me. Based on what you've described, I recommend monitoring your condition closely. If symptoms worsen or you have concerns, please consult with a healthcare professional for proper evaluation and treatment."
+}
+
+# Canned transcripts for _mock_transcription, paired with their word counts
+_MOCK_TRANSCRIPTS = {
+    language_code: (transcript, len(transcript.split()))
+    for language_code, transcript in {
+        'en-US': "I've been experiencing chest pain and shortness of breath for the past two days. The pain is sharp and occurs mainly when I take deep breaths. I also feel dizzy occasionally.",
+        'hi-IN': "मुझे पिछले दो दिनों से सीने में दर्द और सांस लेने में तकलीफ हो रही है। दर्द तेज है और मुख्यतः गहरी सांस लेते समय होता है।",
+        'es-US': "He estado experimentando dolor en el pecho y dificultad para respirar durante los últimos dos días. El dolor es agudo y ocurre principalmente cuando respiro profundo."
+    }.items()
+}
+
+# Base64 silence returned by _mock_speech_synthesis
+_MOCK_AUDIO_B64 = base64.b64encode(b'\x00' * 1024).decode('utf-8')
+
+@lru_cache(maxsize=None)
+def _client(service: str, region: str):
+    """Return a shared boto3 client per (service, region); None is cached if creation fails."""
+    try:
+        return boto3.client(service, region_name=region)
+    except Exception as e:
+        logger.warning(f"Could not initialize {service} client: {e}")
+        return None
+
+@lru_cache(maxsize=1)
+def _aws_credentials():
+    """Return the default chain's credentials (refreshed by botocore as needed), or None."""
+    return boto3.Session().get_credentials()
+
+_polly_http: Optional[httpx.AsyncClient] = None
+
+def _polly_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client used for direct Polly requests."""
+    global _polly_http
+    if _polly_http is None:
+        _polly_http = httpx.AsyncClient(timeout=POLLY_HTTP_TIMEOUT_SECONDS)
+    return _polly_http
+
+class DirectPollyUnavailable(Exception):
+    """The direct Polly request was never sent, so boto3 can safely make it instead."""
+
 class TranscribeService:
     """AWS Transcribe service for speech-to-text conversion."""
     
+    supported_languages = SUPPORTED_LANGUAGES
+    
     def __init__(self, region: str = "ap-south-1"):
         self.region = region
-        self._transcribe_client = None
-        
-        # Supported languages for medical transcription
-        self.supported_languages = {
-            'en-US': 'English (US)',
-            'en-GB': 'English (UK)',
-            'en-AU': 'English (Australia)',
-            'es-US': 'Spanish (US)',
-            'fr-FR': 'French',
-            'de-DE': 'German',
-            'it-IT': 'Italian',
-            'pt-BR': 'Portuguese (Brazil)',
-            'hi-IN': 'Hindi (India)',
-            'ta-IN': 'Tamil (India)'
-        }
     
     @property
     def transcribe_client(self):
         """Get Transcribe client with lazy initialization."""
-        if self._transcribe_client is None:
-            try:
-                self._transcribe_client = boto3.client('transcribe', region_name=self.region)
-            except Exception as e:
-                logger.warning(f"Could not initialize Transcribe client: {e}")
-                self._transcribe_client = None
-        return self._transcribe_client
+        return _client('transcribe', self.region)
     
-    def transcribe_audio(self, audio_data: bytes, language_code: str = 'en-US', 
-                        medical_context: bool = True) -> Dict[str, Any]:
-        """Transcribe audio data to text."""
+    async def transcribe_audio(self, audio_data: bytes, language_code: str = 'en-US', 
+                              medical_context: bool = True, poll_interval_base: float = 1.0,
+                              media_s3_uri: Optional[str] = None) -> Dict[str, Any]:
+        """Transcribe audio data to text.
+        
+        Callers whose audio is already in S3 (e.g. uploaded through
+        S3Service.generate_presigned_put) pass media_s3_uri and no bytes are re-uploaded.
+        """
         
         if not self.transcribe_client:
             return self._mock_transcription(audio_data, language_code)
         
+        # Generate unique job name
+        job_name = f"medimate-transcription-{uuid.uuid4()}"
+        
         try:
-            # Generate unique job name
-            job_name = f"medimate-transcription-{uuid.uuid4()}"
-            
-            # Upload audio to S3 first (required for Transcribe)
+            # Upload audio to S3 first (required for Transcribe) unless it is already there
             from .s3_service import get_s3_service
             s3_service = get_s3_service()
             
-            # Upload audio file
-            audio_key = f"transcriptions/{job_name}.wav"
-            s3_service.upload_file_bytes(
-                file_bytes=audio_data,
-                key=audio_key,
-                content_type="audio/wav"
-            )
+            if not media_s3_uri:
+                audio_key = f"transcriptions/{job_name}.wav"
+                media_s3_uri = await asyncio.to_thread(
+                    s3_service.upload_file_bytes,
+                    file_bytes=audio_data,
+                    key=audio_key,
+                    content_type="audio/wav"
+                )
             
             # Start transcription job
             job_params = {
                 'TranscriptionJobName': job_name,
                 'LanguageCode': language_code,
                 'Media': {
-                    'MediaFileUri': f"s3://{s3_service.bucket_name}/{audio_key}"
+                    'MediaFileUri': media_s3_uri
                 },
                 'OutputBucketName': s3_service.bucket_name,
                 'OutputKey': f"transcriptions/output/{job_name}.json"
@@ -94,24 +258,41 @@ class TranscribeService:
                     'RedactionOutput': 'redacted'
                 }
             
-            response = self.transcribe_client.start_transcription_job(**job_params)
+            # With completion events enabled, register before starting the job
+            # so an early event cannot be missed
+            completion = None
+            if TRANSCRIBE_EVENTS_ENABLED:
+                completion = asyncio.get_running_loop().create_future()
+                _pending_transcriptions[job_name] = completion
+            
+            response = await asyncio.to_thread(self.transcribe_client.start_transcription_job, **job_params)
+            started = time.monotonic()
             
-            # Wait for job completion (in production, this would be async)
-            import time
-            max_wait_time = 300  # 5 minutes
-            wait_time = 0
+            # Wait for the job state change event instead of polling; the final
+            # state is then read once below (a timeout leaves one last check)
+            if completion is not None:
+                try:
+                    await asyncio.wait_for(completion, TRANSCRIBE_MAX_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
             
-            while wait_time < max_wait_time:
-                job_status = self.transcribe_client.get_transcription_job(
+            # Otherwise poll for completion without blocking the event loop, backing
+            # off exponentially so long recordings cost few GetTranscriptionJob calls
+            attempt = 0
+            
+            while True:
+                job_status = await asyncio.to_thread(
+                    self.transcribe_client.get_transcription_job,
                     TranscriptionJobName=job_name
                 )
+                wait_time = int(time.monotonic() - started)
                 
                 status = job_status['TranscriptionJob']['TranscriptionJobStatus']
                 
                 if status == 'COMPLETED':
                     # Get transcription result
                     transcript_uri = job_status['TranscriptionJob']['Transcript']['TranscriptFileUri']
-                    transcript_data = self._get_transcript_from_s3(transcript_uri)
+                    transcript_data = await asyncio.to_thread(self._get_transcript_from_s3, transcript_uri)
                     
                     return {
                         'success': True,
@@ -129,8 +310,13 @@ class TranscribeService:
                     logger.error(f"Transcription job failed: {failure_reason}")
                     return self._mock_transcription(audio_data, language_code)
                 
-                time.sleep(5)
-                wait_time += 5
+                remaining = TRANSCRIBE_MAX_WAIT_SECONDS - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                
+                delay = min(TRANSCRIBE_MAX_POLL_INTERVAL_SECONDS, poll_interval_base * 2 ** attempt, remaining)
+                await asyncio.sleep(delay)
+                attempt += 1
             
             # Timeout
             logger.warning(f"Transcription job {job_name} timed out")
@@ -139,6 +325,8 @@ class TranscribeService:
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
             return self._mock_transcription(audio_data, language_code)
+        finally:
+            _pending_transcriptions.pop(job_name, None)
     
     def _mock_transcription(self, audio_data: bytes, language_code: str) -> Dict[str, Any]:
         """Mock transcription for when Transcribe is unavailable."""
@@ -147,13 +335,7 @@ class TranscribeService:
         audio_size_mb = len(audio_data) / (1024 * 1024)
         processing_time = max(2, int(audio_size_mb * 10))  # Rough estimate
         
-        mock_transcripts = {
-            'en-US': "I've been experiencing chest pain and shortness of breath for the past two days. The pain is sharp and occurs mainly when I take deep breaths. I also feel dizzy occasionally.",
-            'hi-IN': "मुझे पिछले दो दिनों से सीने में दर्द और सांस लेने में तकलीफ हो रही है। दर्द तेज है और मुख्यतः गहरी सांस लेते समय होता है।",
-            'es-US': "He estado experimentando dolor en el pecho y dificultad para respirar durante los últimos dos días. El dolor es agudo y ocurre principalmente cuando respiro profundo."
-        }
-        
-        transcript = mock_transcripts.get(language_code, mock_transcripts['en-US'])
+        transcript, word_count = _MOCK_TRANSCRIPTS.get(language_code, _MOCK_TRANSCRIPTS['en-US'])
         
         return {
             'success': True,
@@ -164,7 +346,7 @@ class TranscribeService:
             'medical_context': True,
             'speaker_labels': {'speakers': 1},
             'processing_time_seconds': processing_time,
-            'word_count': len(transcript.split()),
+            'word_count': word_count,
             'mock_mode': True
         }
     
@@ -180,12 +362,15 @@ class TranscribeService:
             
             bucket_name, key = match.groups()
             
-            # Get transcript from S3
+            # Parse the transcript straight from the S3 response stream
             from .s3_service import get_s3_service
             s3_service = get_s3_service()
             
-            transcript_json = s3_service.get_file_content(key)
-            return json.loads(transcript_json)
+            body = s3_service.s3.get_object(Bucket=bucket_name, Key=key)['Body']
+            try:
+                return orjson.loads(body.read())
+            finally:
+                body.close()
             
         except Exception as e:
             logger.error(f"Failed to get transcript from S3: {e}")
@@ -199,14 +384,23 @@ class TranscribeService:
             if not items:
                 return 0.8  # Default confidence
             
-            confidences = []
-            for item in items:
-                if 'alternatives' in item and item['alternatives']:
-                    confidence = item['alternatives'][0].get('confidence')
-                    if confidence:
-                        confidences.append(float(confidence))
+            scores = (
+                float(item['alternatives'][0]['confidence'])
+                for item in items
+                if item.get('alternatives') and item['alternatives'][0].get('confidence')
+            )
+            
+            # Reduce in NumPy when available, otherwise keep a running mean
+            if np is not None:
+                values = np.fromiter(scores, dtype=np.float64)
+                return float(values.mean()) if values.size else 0.8
             
-            return sum(confidences) / len(confidences) if confidences else 0.8
+            total, count = 0.0, 0
+            for score in scores:
+                total += score
+                count += 1
+            
+            return total / count if count else 0.8
             
         except Exception:
             return 0.8
@@ -214,48 +408,39 @@ class TranscribeService:
 class PollyService:
     """AWS Polly service for text-to-speech conversion."""
     
+    voices = POLLY_VOICES
+    
+    _voices_cache = CacheManager()
+    
+    # LRU of synthesis results keyed by (digest of text/voice/language/format, inline flag)
+    _speech_cache: "OrderedDict[Tuple[bytes, bool], Dict[str, Any]]" = OrderedDict()
+    _speech_cache_lock = threading.Lock()
+    
     def __init__(self, region: str = "ap-south-1"):
         self.region = region
-        self._polly_client = None
-        
-        # Available voices for different languages
-        self.voices = {
-            'en-US': {
-                'female': ['Joanna', 'Kimberly', 'Salli', 'Kendra', 'Ivy'],
-                'male': ['Matthew', 'Justin', 'Joey']
-            },
-            'en-GB': {
-                'female': ['Emma', 'Amy'],
-                'male': ['Brian']
-            },
-            'hi-IN': {
-                'female': ['Aditi'],
-                'male': []
-            },
-            'es-US': {
-                'female': ['Penelope', 'Lupe'],
-                'male': ['Miguel']
-            }
-        }
     
     @property
     def polly_client(self):
         """Get Polly client with lazy initialization."""
-        if self._polly_client is None:
-            try:
-                self._polly_client = boto3.client('polly', region_name=self.region)
-            except Exception as e:
-                logger.warning(f"Could not initialize Polly client: {e}")
-                self._polly_client = None
-        return self._polly_client
+        return _client('polly', self.region)
     
     def synthesize_speech(self, text: str, voice_id: str = 'Joanna', 
-                         language_code: str = 'en-US', output_format: str = 'mp3') -> Dict[str, Any]:
-        """Convert text to speech using AWS Polly."""
+                         language_code: str = 'en-US', output_format: str = 'mp3',
+                         inline_audio: bool = POLLY_INLINE_AUDIO) -> Dict[str, Any]:
+        """Convert text to speech using AWS Polly.
+        
+        The audio is written to S3 and returned as a presigned `audio_url`;
+        with `inline_audio` it is returned base64-encoded in `audio_data`.
+        """
         
         if not self.polly_client:
             return self._mock_speech_synthesis(text, voice_id, language_code)
         
+        cache_key = self._speech_cache_key(text, voice_id, language_code, output_format)
+        cached = self._cached_speech(cache_key, inline_audio)
+        if cached is not None:
+            return self._with_audio_url(cached)
+        
         try:
             # Prepare SSML for medical context
             ssml_text = self._prepare_medical_ssml(text)
@@ -272,30 +457,148 @@ class PollyService:
             # Get audio stream
             audio_stream = response['AudioStream'].read()
             
-            return {
-                'success': True,
-                'audio_data': base64.b64encode(audio_stream).decode('utf-8'),
-                'audio_format': output_format,
-                'voice_id': voice_id,
-                'language_code': language_code,
-                'text_length': len(text),
-                'audio_size_bytes': len(audio_stream),
-                'content_type': f'audio/{output_format}'
-            }
+            return self._store_speech(cache_key, text, voice_id, language_code, output_format,
+                                      inline_audio, audio_stream)
             
         except Exception as e:
             logger.error(f"Speech synthesis failed: {e}")
             return self._mock_speech_synthesis(text, voice_id, language_code)
     
+    async def synthesize_speech_async(self, text: str, voice_id: str = 'Joanna',
+                                      language_code: str = 'en-US', output_format: str = 'mp3',
+                                      inline_audio: bool = POLLY_INLINE_AUDIO) -> Dict[str, Any]:
+        """Async synthesize_speech that calls Polly over HTTP directly, falling back to boto3."""
+        
+        if not POLLY_DIRECT_HTTP_ENABLED or not self.polly_client:
+            return await asyncio.to_thread(
+                self.synthesize_speech, text, voice_id, language_code, output_format, inline_audio
+            )
+        
+        cache_key = self._speech_cache_key(text, voice_id, language_code, output_format)
+        cached = self._cached_speech(cache_key, inline_audio)
+        if cached is not None:
+            return self._with_audio_url(cached)
+        
+        try:
+            audio_stream = await self.synthesize_speech_fast(
+                self._prepare_medical_ssml(text), voice_id, language_code, output_format
+            )
+        except DirectPollyUnavailable as e:
+            # Only when the request never reached Polly; a 5xx or read timeout may
+            # already have been synthesized and billed, so it is not repeated
+            logger.warning(f"Direct Polly request not sent, falling back to boto3: {e}")
+            return await asyncio.to_thread(
+                self.synthesize_speech, text, voice_id, language_code, output_format, inline_audio
+            )
+        except Exception as e:
+            logger.error(f"Direct Polly request failed: {e!r}")
+            raise
+        
+        return await asyncio.to_thread(
+            self._store_speech, cache_key, text, voice_id, language_code, output_format,
+            inline_audio, audio_stream
+        )
+    
+    async def synthesize_speech_fast(self, ssml_text: str, voice_id: str, language_code: str,
+                                     output_format: str) -> bytes:
+        """POST a SigV4-signed SynthesizeSpeech request and return the raw audio bytes.
+        
+        Raises DirectPollyUnavailable when the request could not be sent at all.
+        """
+        try:
+            credentials = _aws_credentials()
+            frozen_credentials = credentials.get_frozen_credentials() if credentials else None
+        except BotoCoreError as e:
+            raise DirectPollyUnavailable(f"credential refresh failed: {e}") from e
+        if frozen_credentials is None:
+            raise DirectPollyUnavailable("no AWS credentials available")
+        
+        url = f"https://polly.{self.region}.amazonaws.com/v1/speech"
+        body = orjson.dumps({
+            'Engine': 'neural',
+            'LanguageCode': language_code,
+            'OutputFormat': output_format,
+            'Text': ssml_text,
+            'TextType': 'ssml',
+            'VoiceId': voice_id
+        })
+        request = AWSRequest(method='POST', url=url, data=body, headers={'Content-Type': 'application/json'})
+        SigV4Auth(frozen_credentials, 'polly', self.region).add_auth(request)
+        
+        try:
+            response = await _polly_http_client().post(url, content=body, headers=dict(request.headers.items()))
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            raise DirectPollyUnavailable(f"connection failed: {e!r}") from e
+        response.raise_for_status()
+        return response.content
+    
+    @staticmethod
+    def _speech_cache_key(text: str, voice_id: str, language_code: str, output_format: str) -> bytes:
+        return hashlib.blake2b(
+            '\x1f'.join((text, voice_id, language_code, output_format)).encode('utf-8'),
+            digest_size=16
+        ).digest()
+    
+    def _cached_speech(self, cache_key: bytes, inline_audio: bool) -> Optional[Dict[str, Any]]:
+        with self._speech_cache_lock:
+            cached = self._speech_cache.get((cache_key, inline_audio))
+            if cached is not None:
+                self._speech_cache.move_to_end((cache_key, inline_audio))
+            return cached
+    
+    def _store_speech(self, cache_key: bytes, text: str, voice_id: str, language_code: str,
+                      output_format: str, inline_audio: bool, audio_stream: bytes) -> Dict[str, Any]:
+        """Build the synthesis result for Polly audio, storing it in S3 unless inline."""
+        result = {
+            'success': True,
+            'audio_format': output_format,
+            'voice_id': voice_id,
+            'language_code': language_code,
+            'text_length': len(text),
+            'audio_size_bytes': len(audio_stream),
+            'content_type': f'audio/{output_format}'
+        }
+        
+        if not inline_audio:
+            # Content-addressed key: identical syntheses share one object
+            audio_key = f"tts/{cache_key.hex()}.{output_format}"
+            try:
+                from .s3_service import get_s3_service
+                get_s3_service().upload_file_bytes(audio_stream, audio_key, result['content_type'])
+                result['audio_key'] = audio_key
+            except Exception as e:
+                logger.warning(f"Storing synthesized audio in S3 failed, returning it inline: {e}")
+        
+        if 'audio_key' not in result:
+            result['audio_data'] = base64.b64encode(audio_stream).decode('utf-8')
+        
+        # A fallback to inline audio is not cached so the next call retries S3
+        if inline_audio or 'audio_key' in result:
+            with self._speech_cache_lock:
+                self._speech_cache[(cache_key, inline_audio)] = result
+                if len(self._speech_cache) > SPEECH_CACHE_MAX_ENTRIES:
+                    self._speech_cache.popitem(last=False)
+        
+        return self._with_audio_url(result)
+    
+    def _with_audio_url(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a synthesis result, swapping its S3 key for a presigned URL."""
+        result = dict(result)
+        audio_key = result.pop('audio_key', None)
+        if audio_key:
+            from .s3_service import get_s3_service
+            # S3Service reuses presigned URLs, so report how long this one has left
+            presigned = get_s3_service().get_file_url(audio_key, expiration=SPEECH_URL_EXPIRATION_SECONDS)
+            result['audio_url'] = presigned.get('url')
+            result['audio_url_expires_in'] = presigned.get('expires_in')
+        return result
+    
     def _mock_speech_synthesis(self, text: str, voice_id: str, language_code: str) -> Dict[str, Any]:
         """Mock speech synthesis for when Polly is unavailable."""
         
-        # Create a small mock audio data (base64 encoded silence)
-        mock_audio = base64.b64encode(b'\x00' * 1024).decode('utf-8')
-        
         return {
             'success': True,
-            'audio_data': mock_audio,
+            'audio_data': _MOCK_AUDIO_B64,
             'audio_format': 'mp3',
             'voice_id': voice_id,
             'language_code': language_code,
@@ -309,33 +612,10 @@ class PollyService:
     def _prepare_medical_ssml(self, text: str) -> str:
         """Prepare SSML markup for medical text with appropriate pronunciation."""
         
-        # Medical terms that need special pronunciation
-        medical_pronunciations = {
-            'hypertension': '<phoneme alphabet="ipa" ph="ˌhaɪpərˈtɛnʃən">hypertension</phoneme>',
-            'diabetes': '<phoneme alphabet="ipa" ph="ˌdaɪəˈbiːtiːz">diabetes</phoneme>',
-            'pneumonia': '<phoneme alphabet="ipa" ph="nuːˈmoʊniə">pneumonia</phoneme>',
-            'arrhythmia': '<phoneme alphabet="ipa" ph="əˈrɪθmiə">arrhythmia</phoneme>',
-            'tachycardia': '<phoneme alphabet="ipa" ph="ˌtækɪˈkɑrdiə">tachycardia</phoneme>'
-        }
-        
-        # Apply medical pronunciations
-        ssml_text = text
-        for term, pronunciation in medical_pronunciations.items():
-            ssml_text = ssml_text.replace(term, pronunciation)
-        
-        # Add appropriate pauses and emphasis
-        ssml_text = ssml_text.replace('.', '.<break time="500ms"/>')
-        ssml_text = ssml_text.replace(',', ',<break time="300ms"/>')
-        ssml_text = ssml_text.replace('!', '!<break time="700ms"/>')
-        ssml_text = ssml_text.replace('?', '?<break time="600ms"/>')
-        
-        # Emphasize important medical terms
-        important_terms = ['emergency', 'urgent', 'critical', 'severe', 'immediate']
-        for term in important_terms:
-            ssml_text = ssml_text.replace(term, f'<emphasis level="strong">{term}</emphasis>')
+        inner = _SSML_RE.sub(lambda m: _SSML_TABLE[m.group(0).lower()].format(m.group(0)), text)
         
         # Wrap in SSML tags
-        return f'<speak><prosody rate="medium" pitch="medium">{ssml_text}</prosody></speak>'
+        return f'<speak><prosody rate="medium" pitch="medium">{inner}</prosody></speak>'
     
     def get_available_voices(self, language_code: str = None) -> Dict[str, Any]:
         """Get available voices for speech synthesis."""
@@ -343,6 +623,11 @@ class PollyService:
         if not self.polly_client:
             return self._mock_available_voices(language_code)
         
+        cache_key = language_code or 'all'
+        cached = self._voices_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             params = {}
             if language_code:
@@ -361,16 +646,23 @@ class PollyService:
                     'supported_engines': voice.get('SupportedEngines', [])
                 })
             
-            return {
+            result = {
                 'success': True,
                 'voices': voices,
                 'total_count': len(voices)
             }
+            self._voices_cache.set(cache_key, result, ttl=VOICES_CACHE_TTL_SECONDS)
+            return result
             
         except Exception as e:
             logger.error(f"Failed to get available voices: {e}")
             return self._mock_available_voices(language_code)
     
+    @classmethod
+    def invalidate_voices_cache(cls) -> None:
+        """Drop cached DescribeVoices results, e.g. after Polly adds voices."""
+        cls._voices_cache.clear()
+    
     def _mock_available_voices(self, language_code: str = None) -> Dict[str, Any]:
         """Mock available voices for when Polly is unavailable."""
         
@@ -417,17 +709,24 @@ class VoiceService:
     def __init__(self):
         self.transcribe_service = TranscribeService()
         self.polly_service = PollyService()
+        self._polly_slots = asyncio.Semaphore(POLLY_MAX_CONCURRENCY)
+        self._warmup_tasks: set = set()
+        
+        # Static facts reported by health_check, computed once
+        en_us_voices = self.polly_service.voices.get('en-US', {})
+        self._en_us_voice_count = sum(len(en_us_voices.get(gender, [])) for gender in ('female', 'male'))
+        self._supported_lang_keys = tuple(self.transcribe_service.supported_languages)
     
-    def process_voice_input(self, audio_data: bytes, language_code: str = 'en-US') -> Dict[str, Any]:
+    async def process_voice_input(self, audio_data: bytes, language_code: str = 'en-US') -> Dict[str, Any]:
         """Process voice input and return transcribed text."""
         
-        return self.transcribe_service.transcribe_audio(
+        return await self.transcribe_service.transcribe_audio(
             audio_data=audio_data,
             language_code=language_code,
             medical_context=True
         )
     
-    def generate_voice_response(self, text: str, voice_preferences: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def generate_voice_response(self, text: str, voice_preferences: Dict[str, Any] = None) -> Dict[str, Any]:
         """Generate voice response from text."""
         
         if not voice_preferences:
@@ -437,19 +736,33 @@ class VoiceService:
                 'output_format': 'mp3'
             }
         
-        return self.polly_service.synthesize_speech(
-            text=text,
-            voice_id=voice_preferences.get('voice_id', 'Joanna'),
-            language_code=voice_preferences.get('language_code', 'en-US'),
-            output_format=voice_preferences.get('output_format', 'mp3')
-        )
+        request = {
+            'text': text,
+            'voice_id': voice_preferences.get('voice_id', 'Joanna'),
+            'language_code': voice_preferences.get('language_code', 'en-US'),
+            'output_format': voice_preferences.get('output_format', 'mp3'),
+            'inline_audio': voice_preferences.get('inline_audio', POLLY_INLINE_AUDIO)
+        }
+        
+        async with self._polly_slots:
+            return await self.polly_service.synthesize_speech_async(**request)
     
-    def create_voice_conversation(self, audio_input: bytes, language_code: str = 'en-US',
-                                voice_preferences: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Complete voice conversation: transcribe input and generate voice response."""
+    async def create_voice_conversation(self, audio_input: bytes, language_code: str = 'en-US',
+                                      voice_preferences: Dict[str, Any] = None,
+                                      now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """Complete voice conversation: transcribe input and generate voice response.
+        
+        `now_iso` is the caller's request timestamp (e.g. `request.state.now_iso`);
+        the clock is only read here when it is not supplied.
+        """
+        
+        # Warm the Polly client and its connection while transcription runs
+        warmup = asyncio.create_task(self._warm_polly(language_code))
+        self._warmup_tasks.add(warmup)
+        warmup.add_done_callback(self._warmup_tasks.discard)
         
         # Step 1: Transcribe audio input
-        transcription_result = self.process_voice_input(audio_input, language_code)
+        transcription_result = await self.process_voice_input(audio_input, language_code)
         
         if not transcription_result['success']:
             return {
@@ -465,7 +778,7 @@ class VoiceService:
         ai_response = self._generate_ai_response(user_message)
         
         # Step 3: Generate voice response
-        voice_response = self.generate_voice_response(ai_response, voice_preferences)
+        voice_response = await self.generate_voice_response(ai_response, voice_preferences)
         
         return {
             'success': True,
@@ -476,32 +789,58 @@ class VoiceService:
             },
             'ai_response': {
                 'text': ai_response,
+                'audio_url': voice_response.get('audio_url'),
                 'audio_data': voice_response.get('audio_data'),
                 'audio_format': voice_response.get('audio_format')
             },
-            'conversation_id': str(uuid.uuid4()),
-            'timestamp': datetime.now().isoformat()
+            'conversation_id': uuid.uuid4().hex,
+            'timestamp': now_iso or datetime.now(timezone.utc).isoformat()
         }
     
+    async def create_voice_conversations_batch(self, inputs: List[Dict[str, Any]], concurrency: int = 16,
+                                               timeout: float = TRANSCRIBE_MAX_WAIT_SECONDS + 60) -> List[Dict[str, Any]]:
+        """Run several voice conversations concurrently.
+        
+        Each input holds create_voice_conversation keyword arguments. At most
+        `concurrency` run at once, and a conversation still waiting after
+        `timeout` seconds gives up its slot with an error result.
+        """
+        slots = asyncio.Semaphore(concurrency)
+        now_iso = datetime.now(timezone.utc).isoformat()
+        
+        async def run(conversation_input: Dict[str, Any]) -> Dict[str, Any]:
+            async with slots:
+                try:
+                    conversation = self.create_voice_conversation(**{'now_iso': now_iso, **conversation_input})
+                    return await asyncio.wait_for(conversation, timeout)
+                except asyncio.TimeoutError:
+                    return {'success': False, 'error': 'Voice conversation timed out'}
+                except Exception as e:
+                    logger.error(f"Voice conversation failed: {e}")
+                    return {'success': False, 'error': 'Voice conversation failed'}
+        
+        return await asyncio.gather(*(run(conversation_input) for conversation_input in inputs))
+    
+    async def _warm_polly(self, language_code: str) -> None:
+        """Create the Polly client and open a connection ahead of synthesis."""
+        try:
+            await asyncio.to_thread(self.polly_service.get_available_voices, language_code)
+        except Exception as e:
+            logger.debug(f"Polly warm-up failed: {e}")
+    
     def _generate_ai_response(self, user_message: str) -> str:
         """Generate AI response to user message (simplified version)."""
         
         # This would integrate with the Bedrock service in production
         # For now, provide basic medical responses
         
-        user_message_lower = user_message.lower()
-        
-        if any(symptom in user_message_lower for symptom in ['chest pain', 'heart', 'cardiac']):
-            return "I understand you're experiencing chest pain. This could be serious. Please seek immediate medical attention if the pain is severe, radiating to your arm or jaw, or accompanied by shortness of breath. For mild discomfort, try to rest and avoid strenuous activity."
-        
-        elif any(symptom in user_message_lower for symptom in ['headache', 'head pain']):
-            return "Headaches can have various causes. Try to rest in a quiet, dark room and stay hydrated. If the headache is severe, sudden, or accompanied by fever, vision changes, or neck stiffness, please seek medical attention immediately."
-        
-        elif any(symptom in user_message_lower for symptom in ['fever', 'temperature']):
-            return "A fever indicates your body is fighting an infection. Stay hydrated, rest, and monitor your temperature. Seek medical attention if your fever is above 103°F (39.4°C), persists for more than 3 days, or is accompanied by severe symptoms."
+        # One scan finds every symptom keyword; the highest-priority category answers
+        found = {_SYMPTOM_CATEGORIES[match.group(0)] for match in _SYMPTOM_RE.finditer(user_message.lower())}
+        for category in _SYMPTOM_PRIORITY:
+            if category in found:
+                return _SYMPTOM_RESPONSES[category]
         
-        else:
-            return "Thank you for sharing your symptoms with me. Based on what you've described, I recommend monitoring your condition closely. If symptoms worsen or you have concerns, please consult with a healthcare professional for proper evaluation and treatment."
+        return _SYMPTOM_RESPONSES['general']
     
     def health_check(self) -> Dict[str, Any]:
         """Check voice services health."""
@@ -526,9 +865,8 @@ class VoiceService:
                 'transcribe': transcribe_health,
                 'polly': polly_health
             },
-            'supported_languages': list(self.transcribe_service.supported_languages.keys()),
-            'available_voices': len(self.polly_service.voices.get('en-US', {}).get('female', [])) + 
-                              len(self.polly_service.voices.get('en-US', {}).get('male', []))
+            'supported_languages': list(self._supported_lang_keys),
+            'available_voices': self._en_us_voice_count
         }
 
 # Service instances
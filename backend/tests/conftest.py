@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backend imports its packages as top-level modules (services, utils, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
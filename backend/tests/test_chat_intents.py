@@ -0,0 +1,41 @@
+import pytest
+
+from ultimate_backend import detect_intents
+
+
+@pytest.mark.parametrize("message", [
+    "urgently need help",
+    "this is an emergency",
+    "my father is critically ill",
+    "i think i am having a heart attack",
+    "i have chest pains",
+    "call 911",
+])
+def test_emergency_messages(message):
+    assert "emergency" in detect_intents(message)
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("i want to book an appointment", "appointment"),
+    ("booking a doctor for tomorrow", "appointment"),
+    ("can i see doctors today", "appointment"),
+    ("i have a headache", "symptom"),
+    ("coughing all night", "symptom"),
+    ("my knee is painful", "symptom"),
+    ("my throat hurts", "symptom"),
+])
+def test_intent_keywords_with_inflections(message, intent):
+    assert intent in detect_intents(message)
+
+
+@pytest.mark.parametrize("message", [
+    "hello there",
+    "she finished her doctorate",
+    "what are your opening hours",
+])
+def test_messages_without_keywords(message):
+    assert detect_intents(message) == frozenset()
+
+
+def test_symptom_with_fever_suggests_appointment():
+    assert {"symptom", "appointment_symptom", "symptom_history"} <= detect_intents("i have a fever")
@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+import pytest
+
+from services import symptom_service
+
+
+@pytest.fixture
+def doctors_by_specialty(monkeypatch):
+    listings = {}
+    monkeypatch.setattr(
+        symptom_service, "find_doctors_by_specialty",
+        lambda specialty, location=None, limit=5: listings.get(specialty, [])
+    )
+    return listings
+
+
+def doctor(doctor_id, rating=None, available_today=False):
+    return {"doctor_id": doctor_id, "rating": rating, "available_today": available_today}
+
+
+def ids(doctors):
+    return [d["doctor_id"] for d in doctors]
+
+
+def test_available_today_first_within_a_rating(doctors_by_specialty):
+    doctors_by_specialty["cardiology"] = [
+        doctor("busy", Decimal("4.8")),
+        doctor("free", Decimal("4.8"), available_today=True),
+        doctor("top", Decimal("4.9")),
+    ]
+    assert ids(symptom_service.find_matching_doctors(["cardiology"])) == ["top", "free", "busy"]
+
+
+def test_missing_ratings_rank_last_without_failing(doctors_by_specialty):
+    doctors_by_specialty["general_practitioner"] = [
+        {"doctor_id": "unrated"},
+        doctor("none", None, available_today=True),
+        doctor("rated", 3.5),
+    ]
+    assert ids(symptom_service.find_matching_doctors(["general_practitioner"])) == ["rated", "none", "unrated"]
+
+
+def test_duplicates_across_specialties_are_listed_once(doctors_by_specialty):
+    shared = doctor("shared", 4.5)
+    doctors_by_specialty["neurology"] = [shared, doctor("neuro", 4.0)]
+    doctors_by_specialty["general_practitioner"] = [shared, doctor("gp", 4.2)]
+    assert ids(symptom_service.find_matching_doctors(["neurology", "general_practitioner"])) == ["shared", "gp", "neuro"]
+
+
+def test_at_most_ten_doctors(doctors_by_specialty):
+    for specialty in ("a", "b", "c"):
+        doctors_by_specialty[specialty] = [doctor(f"{specialty}{i}", i) for i in range(5)]
+    assert len(symptom_service.find_matching_doctors(["a", "b", "c"])) == 10
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from ultimate_backend import EMERGENCY_PHRASES, detect_emergency, detect_intents, is_emergency
+
+
+@pytest.mark.parametrize("phrase", EMERGENCY_PHRASES)
+def test_every_phrase_is_an_emergency_in_chat_and_detect(phrase):
+    message = f"I think this is {phrase}, what should I do?"
+    assert is_emergency(message)
+    assert "emergency" in detect_intents(message.lower())
+    assert asyncio.run(detect_emergency({"symptoms": message}))["emergency"] is True
+
+
+@pytest.mark.parametrize("symptoms", [
+    "Sudden SEVERE BLEEDING from a cut",
+    "brief loss of consciousness this morning",
+    "signs of strokes in the family",
+])
+def test_phrases_added_to_detect(symptoms):
+    assert asyncio.run(detect_emergency({"symptoms": symptoms}))["severity"] == "critical"
+
+
+@pytest.mark.parametrize("symptoms", ["", "mild headache", "runny nose and sneezing"])
+def test_non_emergencies(symptoms):
+    assert not is_emergency(symptoms)
+    assert asyncio.run(detect_emergency({"symptoms": symptoms}))["emergency"] is False
@@ -0,0 +1,41 @@
+import pytest
+
+from models.medical import LabValue, RiskLevel
+from services.textract_service import TextractService
+
+
+@pytest.fixture
+def service():
+    return TextractService()
+
+
+def lab(test_name, status):
+    return LabValue(test_name=test_name, value=1.0, status=status)
+
+
+def test_highest_rule_wins_regardless_of_order(service):
+    # Creatinine (high risk) followed by glucose (moderate) used to report moderate
+    for labs in ([lab("Creatinine", "high"), lab("Glucose", "high")],
+                 [lab("Glucose", "high"), lab("Creatinine", "high")]):
+        assessment = service.assess_risk(labs, [])
+        assert assessment.overall_risk == RiskLevel.HIGH
+        assert assessment.follow_up_needed
+        assert len(assessment.risk_factors) == 2
+
+
+@pytest.mark.parametrize("test_name, status, level", [
+    ("Glucose", "high", RiskLevel.MODERATE),
+    ("Cholesterol", "high", RiskLevel.MODERATE),
+    ("Creatinine", "high", RiskLevel.HIGH),
+    ("Hemoglobin", "low", RiskLevel.MODERATE),
+])
+def test_single_rule_levels(service, test_name, status, level):
+    assessment = service.assess_risk([lab(test_name, status)], [])
+    assert assessment.overall_risk == level
+
+
+def test_no_matching_rule_is_low_risk(service):
+    assessment = service.assess_risk([lab("Glucose", "normal"), lab("Hemoglobin", "high")], [])
+    assert assessment.overall_risk == RiskLevel.LOW
+    assert not assessment.follow_up_needed
+    assert assessment.risk_factors == ["No significant abnormalities detected"]
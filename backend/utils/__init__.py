@@ -9,6 +9,7 @@ This package contains utility modules for the MediMate backend:
 from .aws_clients import (
     aws_clients,
     get_bedrock_client,
+    invoke_claude,
     get_dynamodb_resource,
     get_textract_client,
     get_cognito_client,
@@ -29,6 +30,7 @@ __all__ = [
     # AWS Clients
     'aws_clients',
     'get_bedrock_client',
+    'invoke_claude',
     'get_dynamodb_resource', 
     'get_textract_client',
     'get_cognito_client',
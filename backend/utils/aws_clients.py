@@ -823,6 +823,18 @@ def get_aws_clients():
 def get_bedrock_client():
     return aws_clients.get_bedrock_client()
 
+def invoke_claude(bedrock, prompt: str, max_tokens: int) -> str:
+    """Invoke Claude 3.5 Sonnet and read the response text; blocking, call via asyncio.to_thread"""
+    response = bedrock.invoke_model(
+        modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
+        body=json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        })
+    )
+    return json.loads(response['body'].read())['content'][0]['text']
+
 def get_dynamodb_resource():
     return aws_clients.get_dynamodb_resource()
 
@@ -5,6 +5,8 @@ Production caching system for performance optimization.
 import json
 import time
 import hashlib
+import threading
+from collections import OrderedDict
 from typing import Any, Optional, Dict
 from functools import wraps
 import logging
@@ -12,10 +14,16 @@ import logging
 logger = logging.getLogger(__name__)
 
 class CacheManager:
-    """In-memory cache manager with TTL support."""
+    """In-memory cache manager with TTL support.
     
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    With max_entries set, the least recently used entry is evicted once the
+    cache is full, so keys derived from free-form input cannot grow it forever.
+    """
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        self._cache: Dict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
         self.default_ttl = 300  # 5 minutes
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
@@ -25,11 +33,12 @@ class CacheManager:
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
-        if key in self._cache:
-            entry = self._cache[key]
-            if time.time() < entry['expires_at']:
-                return entry['value']
-            else:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if time.time() < entry['expires_at']:
+                    self._cache.move_to_end(key)
+                    return entry['value']
                 # Expired, remove from cache
                 del self._cache[key]
         return None
@@ -37,69 +46,81 @@ class CacheManager:
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache with TTL."""
         ttl = ttl or self.default_ttl
-        self._cache[key] = {
-            'value': value,
-            'expires_at': time.time() + ttl,
-            'created_at': time.time()
-        }
+        now = time.time()
+        with self._lock:
+            self._cache[key] = {
+                'value': value,
+                'expires_at': now + ttl,
+                'created_at': now
+            }
+            self._cache.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
     
     def delete(self, key: str) -> bool:
         """Delete key from cache."""
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        with self._lock:
+            return self._cache.pop(key, None) is not None
     
     def clear(self) -> None:
         """Clear all cache entries."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
     
     def cleanup_expired(self) -> int:
         """Remove expired entries and return count."""
         current_time = time.time()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if current_time >= entry['expires_at']
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
+        with self._lock:
+            expired_keys = [
+                key for key, entry in self._cache.items()
+                if current_time >= entry['expires_at']
+            ]
+            
+            for key in expired_keys:
+                del self._cache[key]
         
         return len(expired_keys)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         current_time = time.time()
-        active_entries = sum(1 for entry in self._cache.values() 
-                           if current_time < entry['expires_at'])
-        
-        return {
-            'total_entries': len(self._cache),
-            'active_entries': active_entries,
-            'expired_entries': len(self._cache) - active_entries,
-            'memory_usage_mb': len(str(self._cache)) / (1024 * 1024)
-        }
+        with self._lock:
+            active_entries = sum(1 for entry in self._cache.values() 
+                               if current_time < entry['expires_at'])
+            
+            return {
+                'total_entries': len(self._cache),
+                'active_entries': active_entries,
+                'expired_entries': len(self._cache) - active_entries,
+                'memory_usage_mb': len(str(self._cache)) / (1024 * 1024)
+            }
 
 # Global cache instance
 cache = CacheManager()
 
-def cached(ttl: int = 300, key_prefix: str = "default"):
-    """Decorator to cache function results."""
+def cached(ttl: int = 300, key_prefix: str = "default", maxsize: Optional[int] = None):
+    """Decorator to cache function results.
+    
+    With maxsize, the function gets its own LRU-bounded cache instead of the global one.
+    """
     def decorator(func):
+        store = cache if maxsize is None else CacheManager(max_entries=maxsize)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Generate cache key
-            cache_key = cache._generate_key(f"{key_prefix}:{func.__name__}", *args, **kwargs)
+            cache_key = store._generate_key(f"{key_prefix}:{func.__name__}", *args, **kwargs)
             
             # Try to get from cache
-            cached_result = cache.get(cache_key)
+            cached_result = store.get(cache_key)
             if cached_result is not None:
                 logger.debug(f"Cache hit for {func.__name__}")
                 return cached_result
             
             # Execute function and cache result
             result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
+            store.set(cache_key, result, ttl)
             logger.debug(f"Cache miss for {func.__name__}, result cached")
             
             return result
@@ -98,6 +98,19 @@ class Settings(BaseSettings):
     )
     sns_sender_id: str = Field(default="MediMate", env="SNS_SENDER_ID")
     
+    # Textract asynchronous job configuration
+    textract_input_bucket: str = Field(
+        default="medimate-patient-files",
+        env="TEXTRACT_INPUT_BUCKET"
+    )
+    textract_sns_topic_arn: Optional[str] = Field(default=None, env="TEXTRACT_SNS_TOPIC_ARN")
+    textract_sns_role_arn: Optional[str] = Field(default=None, env="TEXTRACT_SNS_ROLE_ARN")
+    
+    # Transcribe job events: SNS-wrapped from this topic, or sent directly by an
+    # EventBridge API destination with this value in the X-MediMate-Events-Secret header
+    transcribe_sns_topic_arn: Optional[str] = Field(default=None, env="TRANSCRIBE_SNS_TOPIC_ARN")
+    transcribe_events_secret: Optional[str] = Field(default=None, env="TRANSCRIBE_EVENTS_SECRET")
+    
     # SES Configuration Extensions
     ses_configuration_set: Optional[str] = Field(
         default=None,
@@ -3,11 +3,15 @@ Centralized logging configuration with CloudWatch integration for MediMate platf
 Provides structured logging with performance metrics and error tracking.
 """
 
+import atexit
+import copy
 import logging
 import logging.config
 import json
+import queue
 import sys
 import traceback
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
@@ -22,6 +26,35 @@ except ImportError:
 
 from utils.config import get_settings
 
+# Background listener that performs root-logger handler I/O (see setup_logging)
+_queue_listener: Optional[QueueListener] = None
+
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps exc_info on the record.
+    
+    The base class formats the record and clears exc_info before queueing,
+    which would drop JSONFormatter's structured "exception" field. Records
+    stay in-process, so the traceback can be passed through as is.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the current queue listener, if any."""
+    global _queue_listener
+    if _queue_listener:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
@@ -511,6 +544,16 @@ def setup_logging(
     # Apply logging configuration
     logging.config.dictConfig(config)
     
+    # Route root-logger records through a queue so stream/file writes happen
+    # on a background thread instead of blocking the logging caller
+    global _queue_listener
+    _stop_queue_listener()
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    _queue_listener = QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+    root_logger.handlers = [StructuredQueueHandler(log_queue)]
+    _queue_listener.start()
+    
     # Create specialized loggers
     loggers = {
         'main': logging.getLogger(app_name),
@@ -7,7 +7,7 @@ import time
 import uuid
 import json
 from typing import Callable, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
 from fastapi import Request, Response
@@ -48,6 +48,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         # Generate unique request ID
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
+        # One clock read per request; handlers reuse it instead of calling datetime.now()
+        request.state.now_iso = datetime.now(timezone.utc).isoformat()
         
         # Skip logging for excluded paths
         if request.url.path in self.exclude_paths:
@@ -0,0 +1,101 @@
+"""
+Amazon SNS message signature verification for HTTP(S) subscription endpoints.
+"""
+
+import base64
+import logging
+import re
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+import httpx
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+
+logger = logging.getLogger(__name__)
+
+# Signing certificates and subscription confirmations only ever go to SNS itself
+_SNS_CERT_HOST_RE = re.compile(r'^sns\.[a-z0-9-]+\.amazonaws\.com(\.cn)?$')
+
+# Fields covered by the signature, in the order SNS signs them
+_SIGNED_FIELDS = {
+    'Notification': ('Message', 'MessageId', 'Subject', 'Timestamp', 'TopicArn', 'Type'),
+    'SubscriptionConfirmation': ('Message', 'MessageId', 'SubscribeURL', 'Timestamp', 'Token', 'TopicArn', 'Type'),
+    'UnsubscribeConfirmation': ('Message', 'MessageId', 'SubscribeURL', 'Timestamp', 'Token', 'TopicArn', 'Type')
+}
+
+_SIGNATURE_HASHES = {'1': hashes.SHA1, '2': hashes.SHA256}
+
+# Signing certificate public keys by URL; SNS rotates them rarely
+_public_keys: Dict[str, Any] = {}
+
+
+def _string_to_sign(message: Dict[str, Any]) -> bytes:
+    """Build the canonical string SNS signed for this message."""
+    parts = []
+    for field in _SIGNED_FIELDS[message['Type']]:
+        # Subject is the only optional signed field
+        if field in message and message[field] is not None:
+            parts.append(f"{field}\n{message[field]}\n")
+    return ''.join(parts).encode('utf-8')
+
+
+async def _signing_key(cert_url: str):
+    """Return the public key of an SNS signing certificate, fetching it once."""
+    key = _public_keys.get(cert_url)
+    if key is None:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(cert_url)
+            response.raise_for_status()
+        key = _public_keys[cert_url] = x509.load_pem_x509_certificate(response.content).public_key()
+    return key
+
+
+async def verify_sns_message(message: Dict[str, Any], expected_topic_arn: str) -> bool:
+    """Check that an SNS message was signed by SNS and was published to expected_topic_arn."""
+
+    if not expected_topic_arn or message.get('TopicArn') != expected_topic_arn:
+        return False
+    if message.get('Type') not in _SIGNED_FIELDS:
+        return False
+
+    hash_type = _SIGNATURE_HASHES.get(str(message.get('SignatureVersion')))
+    cert_url = urlparse(message.get('SigningCertURL') or '')
+    if (hash_type is None or cert_url.scheme != 'https'
+            or not _SNS_CERT_HOST_RE.match(cert_url.hostname or '') or not cert_url.path.endswith('.pem')):
+        return False
+
+    try:
+        key = await _signing_key(cert_url.geturl())
+        key.verify(
+            base64.b64decode(message['Signature']),
+            _string_to_sign(message),
+            padding.PKCS1v15(),
+            hash_type()
+        )
+        return True
+    except (InvalidSignature, KeyError, ValueError, TypeError):
+        return False
+    except Exception as e:
+        logger.error(f"SNS signature verification failed: {e}")
+        return False
+
+
+async def confirm_sns_subscription(message: Dict[str, Any]) -> bool:
+    """Confirm a verified SubscriptionConfirmation by visiting its SubscribeURL."""
+
+    subscribe_url = urlparse(message.get('SubscribeURL') or '')
+    if subscribe_url.scheme != 'https' or not _SNS_CERT_HOST_RE.match(subscribe_url.hostname or ''):
+        return False
+
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(subscribe_url.geturl())
+            response.raise_for_status()
+        logger.info(f"Confirmed SNS subscription to {message.get('TopicArn')}")
+        return True
+    except Exception as e:
+        logger.error(f"SNS subscription confirmation failed: {e}")
+        return False